@@ -0,0 +1,395 @@
+"""Benchmark the integration's own overhead against the local stub server.
+
+Runs entirely on localhost: the stub ML server (``stub_server.py``) runs on
+its own event loop thread, so its CPU time does not pollute the numbers, and
+frames come from synthetic image entities read through the integration's
+regular in-process frame path. Each scenario sets up ``entries`` coordinators
+and triggers them through the service fan-out for ``rounds`` rounds.
+
+    python bench/benchmark.py --sizes 640x480,1920x1080 --entries 1,8 \\
+        --concurrency 1,4 --rounds 20 --output baseline.json
+    python bench/benchmark.py ... --baseline baseline.json
+
+Reported per scenario: throughput (frames/s), end-to-end latency from the
+fan-out call to the coordinator publishing its result (p50/p95/p99), event
+loop time spent inside the detection pipeline (mean/max per run), the worst
+event loop lag seen by a probe task, and the peak Python memory the
+scenario held, traced with ``tracemalloc`` from its setup on (pixel buffers
+Pillow allocates outside the Python allocator are not included). Tracing
+slows everything down a little; ``--no-trace-memory`` turns it off for
+timing-only runs.
+"""
+
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import logging
+import math
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from PIL import Image
+
+from stub_server import StubObicoServer, async_start
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LAG_PROBE_INTERVAL = 0.005
+
+
+def _load_integration(config_dir: Path):
+    """Make ``src/`` importable as ``custom_components.obico_ml``."""
+    package_dir = config_dir / "custom_components"
+    package_dir.mkdir(parents=True, exist_ok=True)
+    (package_dir / "__init__.py").touch()
+    link = package_dir / "obico_ml"
+    if not link.exists():
+        link.symlink_to(REPO_ROOT / "src", target_is_directory=True)
+    sys.path.insert(0, str(config_dir))
+
+    import custom_components.obico_ml as integration
+
+    return integration
+
+
+def _percentile(values: list[float], percentile: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(math.ceil(percentile / 100 * len(ordered)) - 1, 0)
+    return round(ordered[index], 2)
+
+
+def _make_jpeg(width: int, height: int, seed: int) -> bytes:
+    """Build a noisy frame so JPEG sizes resemble a real camera's."""
+    image = Image.effect_noise((width, height), 40 + seed % 20).convert("RGB")
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=85)
+    return output.getvalue()
+
+
+class SyntheticImageEntity:
+    """Stands in for an image entity; serves a fixed JPEG."""
+
+    content_type = "image/jpeg"
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    async def async_image(self) -> bytes:
+        return self.content
+
+
+class SyntheticImageComponent:
+    """Minimal stand-in for the image component's entity lookup."""
+
+    def __init__(self):
+        self.entities: dict[str, SyntheticImageEntity] = {}
+
+    def get_entity(self, entity_id: str) -> SyntheticImageEntity | None:
+        return self.entities.get(entity_id)
+
+
+class StubServerThread:
+    """Run the stub server on a private event loop in a daemon thread."""
+
+    def __init__(self, server: StubObicoServer):
+        self.server = server
+        self.url = None
+        self._loop = asyncio.new_event_loop()
+        self._runner = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._runner, self.url = self._loop.run_until_complete(async_start(self.server))
+        self._ready.set()
+        self._loop.run_forever()
+
+    def start(self) -> str:
+        self._thread.start()
+        self._ready.wait()
+        return self.url
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+async def _probe_loop_lag(stop: asyncio.Event, lags: list[float]) -> None:
+    """Record how late a short sleep wakes up; a blocked loop shows as lag."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        lags.append((loop.time() - start - LAG_PROBE_INTERVAL) * 1000)
+
+
+async def async_run_scenario(
+    integration, config_dir: Path, url: str, scenario: dict, args
+) -> dict:
+    """Set up the scenario's entries, drive them and return its metrics."""
+    if args.trace_memory:
+        # Only this scenario's allocations are traced, not earlier leftovers
+        tracemalloc.start()
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+
+    const = integration.const
+    coordinator_module = integration.coordinator
+
+    hass = HomeAssistant(str(config_dir))
+    hass.config.skip_pip = True
+    await integration.async_setup(
+        hass,
+        {
+            const.DOMAIN: {
+                const.CONF_MAX_CONCURRENT_DETECTIONS: scenario["concurrency"],
+                const.CONF_MAX_CONNECTIONS_PER_SERVER: scenario["concurrency"],
+                # Rounds follow each other closely; every round needs new frames
+                const.CONF_FRAME_CACHE_TTL: 0,
+            }
+        },
+    )
+    images = hass.data["image"] = SyntheticImageComponent()
+    coordinators = hass.data.setdefault(const.DOMAIN, {})
+
+    width, height = scenario["size"]
+    latencies: list[float] = []
+    blocking: list[float] = []
+    round_start = 0.0
+
+    for index in range(scenario["entries"]):
+        entity_id = f"image.bench_{0 if args.shared_camera else index}"
+        images.entities[entity_id] = SyntheticImageEntity(
+            _make_jpeg(width, height, index)
+        )
+        hass.states.async_set(entity_id, "idle")
+        entry = ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=const.DOMAIN,
+            title=f"bench {index}",
+            data={const.CONF_URL: url, const.CONF_CAMERA_ENTITY: entity_id},
+            source="user",
+            options={},
+        )
+        coordinator = coordinator_module.ObicoDataUpdateCoordinator(
+            hass,
+            config_entry=entry,
+            url=url,
+            camera_entity=entity_id,
+            interval=3600,
+            threshold=0.2,
+            transport=scenario["transport"],
+            detection_semaphore=hass.data[const.DATA_DETECTION_SEMAPHORE],
+            batch_window_ms=args.batch_window_ms,
+            resize_long_edge=args.resize_long_edge,
+            frame_cache=hass.data[const.DATA_FRAME_CACHE],
+        )
+        # Same first health check as the entry setup, awaited here
+        await coordinator.async_background_first_refresh()
+
+        def _published(coordinator=coordinator) -> None:
+            latencies.append((time.perf_counter() - round_start) * 1000)
+            blocking.append(coordinator.data.get(const.ATTR_LOOP_BLOCKING_MS) or 0)
+
+        coordinator.async_add_listener(_published)
+        coordinators[entry.entry_id] = coordinator
+
+    entry_ids = list(coordinators)
+    # One untimed round warms connections, codecs and the executor
+    await integration._async_trigger_entries(hass, entry_ids)
+    latencies.clear()
+    blocking.clear()
+
+    if args.trace_memory:
+        tracemalloc.reset_peak()
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe_loop_lag(stop, lags))
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        round_start = time.perf_counter()
+        await integration._async_trigger_entries(hass, entry_ids)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe
+    peak_traced = None
+    if args.trace_memory:
+        # Includes what setup and the warm-up round still hold, e.g. images
+        peak_traced = round(tracemalloc.get_traced_memory()[1] / 1024**2, 2)
+        tracemalloc.stop()
+
+    for coordinator in coordinators.values():
+        await coordinator.async_shutdown()
+    await hass.async_stop(force=True)
+
+    frames = len(latencies)
+    return {
+        "size": f"{width}x{height}",
+        "entries": scenario["entries"],
+        "concurrency": scenario["concurrency"],
+        "transport": scenario["transport"],
+        "frames": frames,
+        "throughput_fps": round(frames / elapsed, 2) if elapsed else None,
+        "latency_p50_ms": _percentile(latencies, 50),
+        "latency_p95_ms": _percentile(latencies, 95),
+        "latency_p99_ms": _percentile(latencies, 99),
+        "loop_blocking_mean_ms": (
+            round(sum(blocking) / len(blocking), 2) if blocking else None
+        ),
+        "loop_blocking_max_ms": round(max(blocking), 2) if blocking else None,
+        "loop_lag_max_ms": round(max(lags), 2) if lags else None,
+        "peak_traced_mb": peak_traced,
+    }
+
+
+COLUMNS = (
+    ("size", "size"),
+    ("entries", "entries"),
+    ("concurrency", "conc"),
+    ("transport", "transport"),
+    ("throughput_fps", "fps"),
+    ("latency_p50_ms", "p50"),
+    ("latency_p95_ms", "p95"),
+    ("latency_p99_ms", "p99"),
+    ("loop_blocking_mean_ms", "blk_avg"),
+    ("loop_blocking_max_ms", "blk_max"),
+    ("loop_lag_max_ms", "lag_max"),
+    ("peak_traced_mb", "traced_mb"),
+)
+COMPARED = ("throughput_fps", "latency_p95_ms", "loop_blocking_mean_ms")
+
+
+def _scenario_key(result: dict) -> tuple:
+    return (
+        result["size"],
+        result["entries"],
+        result["concurrency"],
+        result["transport"],
+    )
+
+
+def _print_table(results: list[dict]) -> None:
+    rows = [[title for _, title in COLUMNS]]
+    rows.extend(
+        ["-" if result[key] is None else str(result[key]) for key, _ in COLUMNS]
+        for result in results
+    )
+    widths = [max(len(row[column]) for row in rows) for column in range(len(COLUMNS))]
+    for row in rows:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+
+
+def _print_comparison(results: list[dict], baseline: list[dict]) -> None:
+    previous = {_scenario_key(result): result for result in baseline}
+    print("\nChange against baseline:")
+    for result in results:
+        before = previous.get(_scenario_key(result))
+        if before is None:
+            continue
+        changes = []
+        for key in COMPARED:
+            if before.get(key) and result.get(key) is not None:
+                delta = (result[key] - before[key]) * 100 / before[key]
+                changes.append(f"{key} {delta:+.1f}%")
+        print(f"  {' / '.join(map(str, _scenario_key(result)))}: {', '.join(changes)}")
+
+
+def _parse_sizes(value: str) -> list[tuple[int, int]]:
+    sizes = []
+    for size in value.split(","):
+        width, height = size.lower().split("x")
+        sizes.append((int(width), int(height)))
+    return sizes
+
+
+def _parse_ints(value: str) -> list[int]:
+    return [int(part) for part in value.split(",")]
+
+
+async def async_main(args) -> list[dict]:
+    config_dir = Path(tempfile.mkdtemp(prefix="obico-bench-"))
+    integration = _load_integration(config_dir)
+
+    stub = StubServerThread(
+        StubObicoServer(
+            latency_ms=args.latency_ms,
+            per_frame_ms=args.per_frame_ms,
+            detections=args.detections,
+            annotated_bytes=args.annotated_bytes,
+        )
+    )
+    url = stub.start()
+    results = []
+    try:
+        for size, entries, concurrency, transport in itertools.product(
+            args.sizes, args.entries, args.concurrency, args.transports
+        ):
+            scenario = {
+                "size": size,
+                "entries": entries,
+                "concurrency": concurrency,
+                "transport": transport,
+            }
+            results.append(
+                await async_run_scenario(integration, config_dir, url, scenario, args)
+            )
+    finally:
+        stub.stop()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=_parse_sizes, default="640x480,1920x1080")
+    parser.add_argument("--entries", type=_parse_ints, default="1,4")
+    parser.add_argument("--concurrency", type=_parse_ints, default="1,4")
+    parser.add_argument(
+        "--transports",
+        type=lambda value: value.split(","),
+        default="binary,json",
+    )
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--batch-window-ms", type=int, default=0)
+    parser.add_argument("--resize-long-edge", type=int, default=0)
+    parser.add_argument(
+        "--shared-camera",
+        action="store_true",
+        help="point every entry at the same camera (A/B servers)",
+    )
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--per-frame-ms", type=float, default=10)
+    parser.add_argument("--detections", type=int, default=1)
+    parser.add_argument("--annotated-bytes", type=int, default=None)
+    parser.add_argument(
+        "--trace-memory",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="report each scenario's peak Python memory (slows the run down)",
+    )
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="compare with a JSON result")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(async_main(args))
+    _print_table(results)
+    if args.baseline:
+        _print_comparison(results, json.loads(args.baseline.read_text()))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Local stub of the Obico ML API wrapper server.
+
+Implements ``GET /hc``, ``POST /detect`` (JSON and binary transports) and
+``POST /detect/batch`` with configurable latency and response sizes, so the
+integration can be exercised without a real inference box.
+
+    python bench/stub_server.py --port 3333 --latency-ms 80 --detections 1
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import time
+
+from aiohttp import MultipartWriter, web
+
+DEFAULT_PORT = 3333
+
+
+class StubObicoServer:
+    """Configurable fake inference server.
+
+    ``latency_ms`` is charged once per request and ``per_frame_ms`` for every
+    additional frame in a batch, mimicking a model that benefits from its
+    batch dimension. ``binary`` and ``batch`` switch the optional endpoints off
+    to exercise the integration's fallbacks.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 50,
+        per_frame_ms: float = 10,
+        detections: int = 0,
+        confidence: float = 0.6,
+        annotated_bytes: int | None = None,
+        binary: bool = True,
+        batch: bool = True,
+    ):
+        self.latency_ms = latency_ms
+        self.per_frame_ms = per_frame_ms
+        self.detections = detections
+        self.confidence = confidence
+        self.annotated_bytes = annotated_bytes
+        self.binary = binary
+        self.batch = batch
+        self.stats = {"hc": 0, "detect": 0, "batch": 0, "frames": 0}
+
+    def make_app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024**2)
+        app.router.add_get("/hc", self.handle_hc)
+        app.router.add_post("/detect", self.handle_detect)
+        if self.batch:
+            app.router.add_post("/detect/batch", self.handle_batch)
+        return app
+
+    def _result(self, image: bytes, threshold: float) -> tuple[dict, bytes | None]:
+        detections = [
+            ["failure", self.confidence, [100 + 20 * i, 100, 40, 40]]
+            for i in range(self.detections)
+            if self.confidence >= threshold
+        ]
+        result = {
+            "detections": detections,
+            "inference_ms": self.latency_ms,
+            "provider": "stub",
+        }
+        if self.annotated_bytes is None:
+            annotated = image
+        else:
+            annotated = b"\xff\xd8" + b"\0" * max(self.annotated_bytes - 2, 0)
+        return result, annotated
+
+    async def handle_hc(self, request: web.Request) -> web.Response:
+        self.stats["hc"] += 1
+        return web.json_response({"status": "ok"})
+
+    async def handle_detect(self, request: web.Request) -> web.StreamResponse:
+        self.stats["detect"] += 1
+        self.stats["frames"] += 1
+        start = time.perf_counter()
+
+        if request.content_type == "application/json":
+            body = await request.json()
+            image = base64.b64decode(body["img"])
+            threshold = float(body.get("threshold", 0))
+            return_annotated = bool(body.get("return_annotated", True))
+            binary = False
+        elif self.binary:
+            image = await request.read()
+            threshold = float(request.query.get("threshold", 0))
+            return_annotated = request.query.get("return_annotated") != "false"
+            binary = True
+        else:
+            return web.Response(status=415, text="Unsupported Media Type")
+
+        await self._async_sleep(start, self.latency_ms)
+        result, annotated = self._result(image, threshold)
+
+        if not binary:
+            if return_annotated:
+                result["image_with_detections"] = base64.b64encode(annotated).decode()
+            return web.json_response(result)
+
+        if not return_annotated:
+            return web.json_response(result)
+
+        with MultipartWriter("mixed") as writer:
+            writer.append_json(result)
+            writer.append(annotated, {"Content-Type": "image/jpeg"})
+        response = web.StreamResponse(
+            headers={"Content-Type": f"multipart/mixed; boundary={writer.boundary}"}
+        )
+        await response.prepare(request)
+        await writer.write(response)
+        await response.write_eof()
+        return response
+
+    async def handle_batch(self, request: web.Request) -> web.Response:
+        self.stats["batch"] += 1
+        start = time.perf_counter()
+        body = await request.json()
+        frames = body.get("frames", [])
+        self.stats["frames"] += len(frames)
+
+        await self._async_sleep(
+            start, self.latency_ms + self.per_frame_ms * max(len(frames) - 1, 0)
+        )
+        results = []
+        for frame in frames:
+            image = base64.b64decode(frame["img"])
+            result, annotated = self._result(image, float(frame.get("threshold", 0)))
+            if frame.get("return_annotated", True):
+                result["image_with_detections"] = base64.b64encode(annotated).decode()
+            results.append(result)
+        return web.json_response({"results": results})
+
+    @staticmethod
+    async def _async_sleep(start: float, duration_ms: float) -> None:
+        remaining = duration_ms / 1000 - (time.perf_counter() - start)
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+
+async def async_start(
+    server: StubObicoServer, host: str = "127.0.0.1", port: int = 0
+) -> tuple[web.AppRunner, str]:
+    """Start the stub and return its runner and ``/detect`` URL."""
+    runner = web.AppRunner(server.make_app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}/detect"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--per-frame-ms", type=float, default=10)
+    parser.add_argument("--detections", type=int, default=0)
+    parser.add_argument("--confidence", type=float, default=0.6)
+    parser.add_argument("--annotated-bytes", type=int, default=None)
+    parser.add_argument("--no-binary", action="store_true")
+    parser.add_argument("--no-batch", action="store_true")
+    args = parser.parse_args()
+
+    server = StubObicoServer(
+        latency_ms=args.latency_ms,
+        per_frame_ms=args.per_frame_ms,
+        detections=args.detections,
+        confidence=args.confidence,
+        annotated_bytes=args.annotated_bytes,
+        binary=not args.no_binary,
+        batch=not args.no_batch,
+    )
+    print(json.dumps({"host": args.host, "port": args.port}))
+    web.run_app(server.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
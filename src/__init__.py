@@ -1,8 +1,14 @@
+import asyncio
 import logging
+import time
+from pathlib import Path
 
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_URL
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import device_registry as dr, entity_registry as er
 from homeassistant.helpers.typing import ConfigType
 
@@ -10,22 +16,139 @@ from .const import (
     DOMAIN,
     PLATFORMS,
     CONF_CAMERA_ENTITY,
+    CONF_EXTRA_URLS,
+    CONF_HEDGE_AFTER_MS,
     CONF_THRESHOLD,
     CONF_INTERVAL,
+    CONF_TRANSPORT,
+    CONF_RERUN_IF_BUSY,
+    CONF_MAX_CONCURRENT_DETECTIONS,
+    CONF_BATCH_WINDOW_MS,
+    CONF_CHANGE_THRESHOLD,
+    CONF_ROI,
+    CONF_RESIZE_LONG_EDGE,
+    CONF_JPEG_QUALITY,
+    CONF_LOCAL_ANNOTATION,
+    CONF_LOCAL_THRESHOLD,
+    CONF_AUTO_DETECT,
+    CONF_MIN_DETECTION_INTERVAL,
+    CONF_MAX_DETECTION_INTERVAL,
+    CONF_DETECTION_INTERVAL_FACTOR,
+    CONF_PRINTER_ENTITY,
+    CONF_ACTIVE_STATES,
+    CONF_DETECT_ON_NEW_FRAME,
+    CONF_MIN_FRAME_GAP,
+    CONF_CONNECT_TIMEOUT,
+    CONF_READ_TIMEOUT,
+    CONF_MAX_CONNECTIONS_PER_SERVER,
+    CONF_IMAGE_MEMORY_BUDGET_MB,
+    CONF_DOWNSCALE_UNVIEWED_AFTER,
+    CONF_FRAME_CACHE_TTL,
+    DEFAULT_TRANSPORT,
+    DEFAULT_MIN_DETECTION_INTERVAL,
+    DEFAULT_MAX_DETECTION_INTERVAL,
+    DEFAULT_DETECTION_INTERVAL_FACTOR,
+    DEFAULT_ACTIVE_STATES,
+    DEFAULT_MIN_FRAME_GAP,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_MAX_CONNECTIONS_PER_SERVER,
+    DEFAULT_MAX_CONCURRENT_DETECTIONS,
+    DEFAULT_IMAGE_MEMORY_BUDGET_MB,
+    DEFAULT_DOWNSCALE_UNVIEWED_AFTER,
+    DEFAULT_FRAME_CACHE_TTL,
+    DATA_DETECTION_SEMAPHORE,
+    DATA_IMAGE_STORE,
+    DATA_FRAME_CACHE,
+    DATA_SETTINGS,
     SERVICE_TRIGGER_DETECTION,
+    SERVICE_ANALYZE_FILES,
+    ATTR_PATH,
+    ATTR_OUTPUT,
+    ATTR_CONCURRENCY,
+    DEFAULT_ANALYSIS_CONCURRENCY,
 )
+from .analysis import async_analyze_files, default_output
 from .coordinator import ObicoDataUpdateCoordinator
+from .frame_cache import ObicoFrameCache
+from .image_store import ObicoImageStore
+from .imaging import parse_roi
+from .persistence import ObicoResultStore
 
 _LOGGER = logging.getLogger(__name__)
 
 
+CONFIG_SCHEMA = vol.Schema(
+    {
+        vol.Optional(DOMAIN): vol.Schema(
+            {
+                vol.Optional(
+                    CONF_MAX_CONCURRENT_DETECTIONS,
+                    default=DEFAULT_MAX_CONCURRENT_DETECTIONS,
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_MAX_CONNECTIONS_PER_SERVER,
+                    default=DEFAULT_MAX_CONNECTIONS_PER_SERVER,
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_IMAGE_MEMORY_BUDGET_MB,
+                    default=DEFAULT_IMAGE_MEMORY_BUDGET_MB,
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_DOWNSCALE_UNVIEWED_AFTER,
+                    default=DEFAULT_DOWNSCALE_UNVIEWED_AFTER,
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_FRAME_CACHE_TTL,
+                    default=DEFAULT_FRAME_CACHE_TTL,
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+ANALYZE_FILES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_PATH): cv.string,
+        vol.Optional(ATTR_OUTPUT): cv.string,
+        vol.Optional(CONF_THRESHOLD): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=1)
+        ),
+        vol.Optional(ATTR_CONCURRENCY, default=DEFAULT_ANALYSIS_CONCURRENCY): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=32)
+        ),
+        **cv.TARGET_SERVICE_FIELDS,
+    }
+)
+
+
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the Obico ML component."""
+    conf = config.get(DOMAIN, {})
+    hass.data[DATA_SETTINGS] = conf
+    hass.data[DATA_DETECTION_SEMAPHORE] = asyncio.Semaphore(
+        conf.get(CONF_MAX_CONCURRENT_DETECTIONS, DEFAULT_MAX_CONCURRENT_DETECTIONS)
+    )
+    hass.data[DATA_IMAGE_STORE] = ObicoImageStore(
+        hass,
+        budget=int(
+            conf.get(CONF_IMAGE_MEMORY_BUDGET_MB, DEFAULT_IMAGE_MEMORY_BUDGET_MB)
+            * 1024**2
+        ),
+        downscale_after=conf.get(
+            CONF_DOWNSCALE_UNVIEWED_AFTER, DEFAULT_DOWNSCALE_UNVIEWED_AFTER
+        ),
+    )
+    hass.data[DATA_FRAME_CACHE] = ObicoFrameCache(
+        hass, ttl=conf.get(CONF_FRAME_CACHE_TTL, DEFAULT_FRAME_CACHE_TTL)
+    )
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Obico detection from a config entry."""
+    setup_start = time.perf_counter()
     hass.data.setdefault(DOMAIN, {})
 
     config_data = entry.options if entry.options else entry.data
@@ -33,6 +156,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     url = config_data.get(CONF_URL, entry.data.get(CONF_URL))
     interval = config_data.get(CONF_INTERVAL, entry.data.get(CONF_INTERVAL, 60))
     threshold = config_data.get(CONF_THRESHOLD, entry.data.get(CONF_THRESHOLD, 0.2))
+    transport = config_data.get(CONF_TRANSPORT, DEFAULT_TRANSPORT)
+    rerun_if_busy = config_data.get(CONF_RERUN_IF_BUSY, False)
+    batch_window_ms = config_data.get(CONF_BATCH_WINDOW_MS, 0)
+    change_threshold = config_data.get(CONF_CHANGE_THRESHOLD, 0)
+    try:
+        roi = parse_roi(config_data.get(CONF_ROI))
+    except ValueError as err:
+        _LOGGER.warning(f"Ignoring invalid region of interest: {err}")
+        roi = None
     camera_entity = entry.data.get(CONF_CAMERA_ENTITY)
 
     coordinator = ObicoDataUpdateCoordinator(
@@ -42,67 +174,220 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         camera_entity=camera_entity,
         interval=interval,
         threshold=threshold,
+        transport=transport,
+        rerun_if_busy=rerun_if_busy,
+        detection_semaphore=hass.data.get(DATA_DETECTION_SEMAPHORE),
+        batch_window_ms=batch_window_ms,
+        change_threshold=change_threshold,
+        roi=roi,
+        resize_long_edge=config_data.get(CONF_RESIZE_LONG_EDGE, 0),
+        jpeg_quality=config_data.get(CONF_JPEG_QUALITY, 0),
+        local_annotation=config_data.get(CONF_LOCAL_ANNOTATION, False),
+        local_threshold=config_data.get(CONF_LOCAL_THRESHOLD, False),
+        image_store=hass.data.get(DATA_IMAGE_STORE),
+        frame_cache=hass.data.get(DATA_FRAME_CACHE),
+        auto_detect=config_data.get(CONF_AUTO_DETECT, False),
+        min_interval=config_data.get(
+            CONF_MIN_DETECTION_INTERVAL, DEFAULT_MIN_DETECTION_INTERVAL
+        ),
+        max_interval=config_data.get(
+            CONF_MAX_DETECTION_INTERVAL, DEFAULT_MAX_DETECTION_INTERVAL
+        ),
+        interval_factor=config_data.get(
+            CONF_DETECTION_INTERVAL_FACTOR, DEFAULT_DETECTION_INTERVAL_FACTOR
+        ),
+        # No fallback to entry.data: a printer entity cleared in the options
+        # is simply absent from them
+        printer_entity=config_data.get(CONF_PRINTER_ENTITY),
+        active_states=config_data.get(CONF_ACTIVE_STATES, DEFAULT_ACTIVE_STATES),
+        connect_timeout=config_data.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT),
+        read_timeout=config_data.get(CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT),
+        detect_on_new_frame=config_data.get(CONF_DETECT_ON_NEW_FRAME, False),
+        min_frame_gap=config_data.get(CONF_MIN_FRAME_GAP, DEFAULT_MIN_FRAME_GAP),
+        extra_urls=config_data.get(
+            CONF_EXTRA_URLS, entry.data.get(CONF_EXTRA_URLS, [])
+        ),
+        hedge_after_ms=config_data.get(CONF_HEDGE_AFTER_MS, 0),
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    # Entities start from the persisted result; the first /hc probe must not
+    # hold up startup while the ML server is still booting
+    await coordinator.async_restore()
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    coordinator.applied_settings = (dict(entry.data), dict(entry.options))
+    entry.async_on_unload(entry.add_update_listener(async_update_listener))
+    entry.async_create_background_task(
+        hass,
+        coordinator.async_background_first_refresh(),
+        f"{DOMAIN} first refresh {entry.entry_id}",
+    )
+    coordinator.async_enable_auto_detection()
+    coordinator.async_enable_frame_trigger()
 
     # Register Service with target support
     async def handle_trigger_detection(call: ServiceCall):
         """Handle the service call with target support."""
-        target_device_ids = set(call.data.get("device_id", []))
-        target_entity_ids = set(call.data.get("entity_id", []))
-
-        # If no target specified, default to ALL (Backward compatibility)
-        if not target_device_ids and not target_entity_ids:
-            for coord in hass.data[DOMAIN].values():
-                await coord.async_trigger_detection()
-            return
-
-        # Find Config Entry IDs associated with the targets
-        target_entry_ids = set()
-
-        # 1. Resolve Devices
-        dev_reg = dr.async_get(hass)
-        for dev_id in target_device_ids:
-            device = dev_reg.async_get(dev_id)
-            if device:
-                for entry_id in device.config_entries:
-                    if entry_id in hass.data[DOMAIN]:
-                        target_entry_ids.add(entry_id)
-
-        # 2. Resolve Entities
-        ent_reg = er.async_get(hass)
-        for ent_id in target_entity_ids:
-            entity = ent_reg.async_get(ent_id)
-            if entity and entity.config_entry_id in hass.data[DOMAIN]:
-                target_entry_ids.add(entity.config_entry_id)
-
-        # 3. Trigger specific coordinators
-        for entry_id in target_entry_ids:
-            if coordinator := hass.data[DOMAIN].get(entry_id):
-                await coordinator.async_trigger_detection()
+        results = await _async_trigger_entries(
+            hass, _resolve_target_entry_ids(hass, call)
+        )
+        return {"entries": results} if call.return_response else None
+
+    async def handle_analyze_files(call: ServiceCall):
+        """Run recorded frames through one entry's ML server(s)."""
+        entry_ids = _resolve_target_entry_ids(hass, call)
+        if len(entry_ids) != 1:
+            raise ServiceValidationError(
+                f"analyze_files needs exactly one Obico entry, got {len(entry_ids)}"
+            )
+        coordinator = hass.data[DOMAIN][entry_ids[0]]
+        path = Path(call.data[ATTR_PATH])
+        output = Path(call.data.get(ATTR_OUTPUT) or default_output(path))
+        for checked in (path, output):
+            if not await hass.async_add_executor_job(
+                hass.config.is_allowed_path, str(checked)
+            ):
+                raise ServiceValidationError(
+                    f"{checked} is not in allowlist_external_dirs"
+                )
+        try:
+            summary = await async_analyze_files(
+                hass,
+                coordinator,
+                path,
+                output,
+                call.data.get(CONF_THRESHOLD, coordinator.threshold),
+                call.data[ATTR_CONCURRENCY],
+            )
+        except (OSError, ValueError) as err:
+            raise HomeAssistantError(f"Unable to analyze {path}: {err}") from err
+        return summary if call.return_response else None
 
     if not hass.services.has_service(DOMAIN, SERVICE_TRIGGER_DETECTION):
         hass.services.async_register(
-            DOMAIN, SERVICE_TRIGGER_DETECTION, handle_trigger_detection
+            DOMAIN,
+            SERVICE_TRIGGER_DETECTION,
+            handle_trigger_detection,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+    if not hass.services.has_service(DOMAIN, SERVICE_ANALYZE_FILES):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_ANALYZE_FILES,
+            handle_analyze_files,
+            schema=ANALYZE_FILES_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
         )
 
+    coordinator.setup_ms = round((time.perf_counter() - setup_start) * 1000, 2)
+    _LOGGER.debug(f"Set up Obico entry {entry.title} in {coordinator.setup_ms} ms")
     return True
 
 
+def _resolve_target_entry_ids(hass: HomeAssistant, call: ServiceCall) -> list[str]:
+    """Return the loaded entries a service call targets (all without a target)."""
+    target_device_ids = set(cv.ensure_list(call.data.get("device_id")))
+    target_entity_ids = set(cv.ensure_list(call.data.get("entity_id")))
+
+    # If no target specified, default to ALL (Backward compatibility)
+    if not target_device_ids and not target_entity_ids:
+        return list(hass.data[DOMAIN])
+
+    # Find Config Entry IDs associated with the targets
+    target_entry_ids = set()
+
+    # 1. Resolve Devices
+    dev_reg = dr.async_get(hass)
+    for dev_id in target_device_ids:
+        device = dev_reg.async_get(dev_id)
+        if device:
+            for entry_id in device.config_entries:
+                if entry_id in hass.data[DOMAIN]:
+                    target_entry_ids.add(entry_id)
+
+    # 2. Resolve Entities
+    ent_reg = er.async_get(hass)
+    for ent_id in target_entity_ids:
+        entity = ent_reg.async_get(ent_id)
+        if entity and entity.config_entry_id in hass.data[DOMAIN]:
+            target_entry_ids.add(entity.config_entry_id)
+
+    return list(target_entry_ids)
+
+
+async def _async_trigger_entries(hass: HomeAssistant, entry_ids) -> dict[str, dict]:
+    """Trigger detection on several entries concurrently.
+
+    Concurrency is bounded by the integration-wide detection semaphore held
+    by each coordinator. A failing entry is logged and does not abort the
+    others. Returns each entry's result summary (or error) by entry id.
+    """
+    coordinators = {
+        entry_id: hass.data[DOMAIN][entry_id]
+        for entry_id in entry_ids
+        if entry_id in hass.data[DOMAIN]
+    }
+    results = await asyncio.gather(
+        *(coord.async_trigger_detection() for coord in coordinators.values()),
+        return_exceptions=True,
+    )
+    summaries = {}
+    for (entry_id, coord), result in zip(coordinators.items(), results):
+        if isinstance(result, Exception):
+            _LOGGER.error(f"Obico detection failed for entry {entry_id}: {result}")
+            summaries[entry_id] = {"error": str(result) or type(result).__name__}
+        else:
+            summaries[entry_id] = coord.result_summary()
+    return summaries
+
+
+def _changed_keys(old: dict, new: dict) -> set[str]:
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+async def async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed settings, reloading the entry unless only the threshold changed.
+
+    A new threshold is applied to the running coordinator, which keeps its
+    pooled session, breaker and latency statistics, and re-filters the last
+    result when the threshold is applied locally.
+    """
+    coordinator = hass.data[DOMAIN].get(entry.entry_id)
+    if coordinator is None:
+        await async_reload_entry(hass, entry)
+        return
+    old_data, old_options = coordinator.applied_settings
+    changed = _changed_keys(old_data, dict(entry.data)) | _changed_keys(
+        old_options, dict(entry.options)
+    )
+    if not changed:
+        return
+    if changed != {CONF_THRESHOLD}:
+        await async_reload_entry(hass, entry)
+        return
+
+    config_data = entry.options if entry.options else entry.data
+    coordinator.applied_settings = (dict(entry.data), dict(entry.options))
+    coordinator.update_threshold(config_data[CONF_THRESHOLD])
+    _LOGGER.debug(f"Applied new threshold {coordinator.threshold} to {entry.title}")
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
     await async_unload_entry(hass, entry)
     await async_setup_entry(hass, entry)
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the persisted result of a removed entry."""
+    await ObicoResultStore(hass, entry.entry_id).async_remove()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
     return unload_ok
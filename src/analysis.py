@@ -0,0 +1,160 @@
+"""Offline analysis of recorded frames through an entry's detection pipeline."""
+
+import asyncio
+import logging
+import time
+import zipfile
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+
+from .api import json_dumps
+
+_LOGGER = logging.getLogger(__name__)
+
+FRAME_SUFFIXES = {".jpg", ".jpeg", ".png"}
+WRITE_EVERY = 100
+PROGRESS_EVERY = 500
+
+
+class FrameSource:
+    """Frames of a directory (recursively) or a zip archive, read one by one.
+
+    Only the frame names are listed up front; each frame is read when a
+    worker needs it, so memory stays flat however long the recording is.
+    All methods block and run in the executor.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._archive: zipfile.ZipFile | None = None
+
+    def open(self) -> list[str]:
+        """Return the frame names in order."""
+        if self.path.is_dir():
+            return sorted(
+                str(file.relative_to(self.path))
+                for file in self.path.rglob("*")
+                if file.suffix.lower() in FRAME_SUFFIXES and file.is_file()
+            )
+        if zipfile.is_zipfile(self.path):
+            self._archive = zipfile.ZipFile(self.path)
+            return sorted(
+                info.filename
+                for info in self._archive.infolist()
+                if not info.is_dir()
+                and Path(info.filename).suffix.lower() in FRAME_SUFFIXES
+            )
+        raise ValueError(f"{self.path} is neither a directory nor a zip archive")
+
+    def read(self, name: str) -> bytes:
+        if self._archive is not None:
+            return self._archive.read(name)
+        return (self.path / name).read_bytes()
+
+    def close(self) -> None:
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+
+def default_output(path: Path) -> Path:
+    """``frames/`` or ``frames.zip`` -> ``frames.obico_ml.jsonl`` next to it."""
+    return path.with_name(f"{path.stem}.obico_ml.jsonl")
+
+
+def _result_line(name: str, result=None, error: Exception | None = None) -> bytes:
+    """One compact JSON line: confidences, boxes and inference time per frame."""
+    if error is not None:
+        row = {"file": name, "error": str(error) or type(error).__name__}
+    else:
+        row = {
+            "file": name,
+            "inference_ms": round(float(result.inference_ms or 0), 2),
+            # [confidence, xc, yc, w, h] in original frame pixels
+            "detections": [
+                [round(confidence, 4), *(round(value, 1) for value in box)]
+                for _label, confidence, box in result.detections
+            ],
+        }
+    return json_dumps(row) + b"\n"
+
+
+async def async_analyze_files(
+    hass: HomeAssistant,
+    coordinator,
+    path: Path,
+    output: Path,
+    threshold: float,
+    concurrency: int,
+) -> dict:
+    """Run every frame under ``path`` through ``coordinator``'s ML server(s).
+
+    At most ``concurrency`` frames are read or in flight at once. Results
+    are appended to ``output`` as JSON lines in completion order, buffered
+    and written from the executor. Entity state is not touched.
+    """
+    source = FrameSource(path)
+    names = await hass.async_add_executor_job(source.open)
+    output_file = await hass.async_add_executor_job(output.open, "wb")
+    _LOGGER.info(
+        "Analyzing %s frames from %s with %s (threshold %s, concurrency %s)",
+        len(names),
+        path,
+        coordinator.name,
+        threshold,
+        concurrency,
+    )
+
+    pending_lines: list[bytes] = []
+    write_lock = asyncio.Lock()
+    summary = {"frames": len(names), "analyzed": 0, "failed": 0, "with_detections": 0}
+    start = time.perf_counter()
+
+    async def async_flush() -> None:
+        async with write_lock:
+            if pending_lines:
+                chunk = b"".join(pending_lines)
+                pending_lines.clear()
+                await hass.async_add_executor_job(output_file.write, chunk)
+
+    async def async_worker(frames) -> None:
+        # Every worker pulls from the same iterator, so frames are handed out
+        # in order and each one exactly once
+        for name in frames:
+            try:
+                content = await hass.async_add_executor_job(source.read, name)
+                result = await coordinator.async_detect_frame(content, threshold)
+            except Exception as err:
+                summary["failed"] += 1
+                pending_lines.append(_result_line(name, error=err))
+            else:
+                summary["analyzed"] += 1
+                if result.detections:
+                    summary["with_detections"] += 1
+                pending_lines.append(_result_line(name, result))
+
+            done = summary["analyzed"] + summary["failed"]
+            if done % PROGRESS_EVERY == 0:
+                _LOGGER.info("Analyzed %s/%s frames from %s", done, len(names), path)
+            if len(pending_lines) >= WRITE_EVERY:
+                await async_flush()
+
+    try:
+        frames = iter(names)
+        await asyncio.gather(
+            *(async_worker(frames) for _ in range(min(concurrency, len(names) or 1)))
+        )
+        await async_flush()
+    finally:
+        await hass.async_add_executor_job(output_file.close)
+        await hass.async_add_executor_job(source.close)
+
+    duration = time.perf_counter() - start
+    summary |= {
+        "output": str(output),
+        "duration_s": round(duration, 2),
+        "fps": round(len(names) / duration, 2) if duration else None,
+    }
+    _LOGGER.info("Analysis of %s finished: %s", path, summary)
+    return summary
@@ -0,0 +1,855 @@
+"""Client for the Obico ML API wrapper server."""
+
+import asyncio
+import base64
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+
+import aiohttp
+from aiohttp import hdrs
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    orjson = None
+
+from .const import (
+    CONF_MAX_CONNECTIONS_PER_SERVER,
+    DATA_BATCHERS,
+    DATA_FRAME_CACHE,
+    DATA_SERVERS,
+    DATA_SETTINGS,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_MAX_CONNECTIONS_PER_SERVER,
+    DEFAULT_READ_TIMEOUT,
+    TRANSPORT_AUTO,
+    TRANSPORT_BINARY,
+    TRANSPORT_JSON,
+)
+from .metrics import STAGE_DECODE, STAGE_ENCODE, STAGE_REQUEST
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_NMS = 0.45
+KEEPALIVE_TIMEOUT = 60
+DNS_CACHE_TTL = 300
+BATCH_MAX_SIZE = 8
+EWMA_ALPHA = 0.3
+
+BREAKER_FAILURE_THRESHOLD = 2
+BREAKER_BASE_BACKOFF = 10
+BREAKER_MAX_BACKOFF = 600
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+# Bodies smaller than this are cheaper to (de)serialize inline than to hand
+# to the executor.
+OFFLOAD_MIN_BYTES = 64 * 1024
+
+# Status codes a JSON-only server answers a raw body with.
+BINARY_UNSUPPORTED_STATUS = {400, 404, 405, 415, 422}
+
+
+class ObicoApiError(Exception):
+    """Raised when the ML server returns an error."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Obico API failed {status}: {message}")
+        self.status = status
+
+
+class ObicoUnavailableError(ObicoApiError):
+    """Raised without touching the network while the circuit breaker is open."""
+
+    def __init__(self, retry_in: float):
+        super().__init__(0, f"server marked down, retrying in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Tracks server health from real traffic.
+
+    After ``BREAKER_FAILURE_THRESHOLD`` consecutive failures the breaker opens
+    for an exponentially growing backoff (capped at ``BREAKER_MAX_BACKOFF``).
+    While open, requests fail fast. Once the backoff has elapsed it is
+    half-open: the next request is let through and its outcome closes or
+    re-opens the breaker.
+    """
+
+    def __init__(self):
+        self.failures = 0
+        self.last_success: float | None = None
+        self._open_until = 0.0
+
+    @property
+    def state(self) -> str:
+        if self.failures < BREAKER_FAILURE_THRESHOLD:
+            return BREAKER_CLOSED
+        if time.monotonic() < self._open_until:
+            return BREAKER_OPEN
+        return BREAKER_HALF_OPEN
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the next request is allowed through."""
+        return max(self._open_until - time.monotonic(), 0.0)
+
+    def raise_if_open(self) -> None:
+        if self.state == BREAKER_OPEN:
+            raise ObicoUnavailableError(self.retry_in)
+
+    def succeeded_within(self, seconds: float) -> bool:
+        """Return True if the last request succeeded less than ``seconds`` ago."""
+        return (
+            self.failures == 0
+            and self.last_success is not None
+            and time.monotonic() - self.last_success < seconds
+        )
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._open_until = 0.0
+        self.last_success = time.monotonic()
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= BREAKER_FAILURE_THRESHOLD:
+            backoff = min(
+                BREAKER_BASE_BACKOFF * 2 ** (self.failures - BREAKER_FAILURE_THRESHOLD),
+                BREAKER_MAX_BACKOFF,
+            )
+            self._open_until = time.monotonic() + backoff
+
+
+@dataclass
+class DetectionResult:
+    """Parsed response of a /detect call."""
+
+    detections: list = field(default_factory=list)
+    inference_ms: float = 0
+    provider: str = "unknown"
+    annotated_image: bytes | None = None
+    # Client-side stage wall times in ms and payload sizes in bytes
+    timings: dict[str, float] = field(default_factory=dict)
+    upload_bytes: int = 0
+    response_bytes: int = 0
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def json_dumps(obj) -> bytes:
+    """Serialize with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def json_loads(data: bytes):
+    """Deserialize with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _b64encode(image: bytes) -> str:
+    return base64.b64encode(image).decode("ascii")
+
+
+def _encode_frame(image_b64: str, threshold: float, return_annotated: bool) -> dict:
+    return {
+        "img": image_b64,
+        "threshold": threshold,
+        "return_annotated": return_annotated,
+    }
+
+
+def _encode_json_payload(
+    image_b64: str, threshold: float, return_annotated: bool
+) -> bytes:
+    """Build the JSON /detect body."""
+    return json_dumps(
+        _encode_frame(image_b64, threshold, return_annotated) | {"nms": DEFAULT_NMS}
+    )
+
+
+def _encode_batch_payload(frames: list[tuple[str, float, bool]]) -> bytes:
+    """Build the JSON /detect/batch body."""
+    return json_dumps(
+        {
+            "frames": [_encode_frame(*frame) for frame in frames],
+            "nms": DEFAULT_NMS,
+        }
+    )
+
+
+def _decode_detection_body(
+    body: bytes, annotated_image: bytes | None = None
+) -> DetectionResult:
+    """Parse a /detect JSON body, base64-decoding the annotated image."""
+    return _parse_detection_data(json_loads(body), annotated_image)
+
+
+def _decode_batch_body(body: bytes) -> list[DetectionResult]:
+    """Parse a /detect/batch JSON body."""
+    return [
+        _parse_detection_data(result) for result in json_loads(body).get("results", [])
+    ]
+
+
+async def async_run_cpu(hass: HomeAssistant, size: int, func, *args):
+    """Run a (de)serialization step in the executor unless ``size`` is small."""
+    if size < OFFLOAD_MIN_BYTES:
+        return func(*args)
+    return await hass.async_add_executor_job(func, *args)
+
+
+async def async_b64encode(hass: HomeAssistant, image: bytes) -> str:
+    """Base64-encode a frame, sharing the work for frames sent to several servers."""
+    frame_cache = hass.data.get(DATA_FRAME_CACHE)
+    if frame_cache is not None:
+        return await frame_cache.async_encode(image)
+    return await async_run_cpu(hass, len(image), _b64encode, image)
+
+
+def _parse_detection_data(
+    data: dict, annotated_image: bytes | None = None
+) -> DetectionResult:
+    """Build a DetectionResult from the server's JSON body."""
+    if annotated_image is None:
+        image_base64 = data.get("image_with_detections")
+        if image_base64:
+            annotated_image = base64.b64decode(image_base64)
+    return DetectionResult(
+        detections=data.get("detections", []),
+        inference_ms=data.get("inference_ms", 0),
+        provider=data.get("provider", "unknown"),
+        annotated_image=annotated_image,
+    )
+
+
+def base_url(url: str) -> str:
+    """Strip the /detect path to get the server's base URL."""
+    return url.split("/detect")[0]
+
+
+class ObicoServer:
+    """Pooled HTTP connection to one ML server, shared by all its entries.
+
+    Owns a dedicated aiohttp session so large uploads keep their own
+    keep-alive connections, a per-host connection limit and a DNS cache,
+    instead of contending with every other integration on the shared HA
+    session. Health state (the circuit breaker) is per server as well.
+    """
+
+    def __init__(self, hass: HomeAssistant, url: str, max_connections: int):
+        self.hass = hass
+        self.base_url = url
+        self.breaker = CircuitBreaker()
+        self.users = 0
+        # Routing signals shared by every entry using this server
+        self.in_flight = 0
+        self.latency_ms: float | None = None
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit_per_host=max_connections,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                enable_cleanup_closed=True,
+            )
+        )
+        self._unsub_close = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_CLOSE, self._async_close_on_stop
+        )
+
+    @property
+    def health_url(self) -> str:
+        return f"{self.base_url}/hc"
+
+    async def async_health_check(self, timeout: float) -> bool:
+        """Return True if the server answers GET /hc with 200."""
+        try:
+            async with self.session.get(
+                self.health_url, timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                if response.status != 200:
+                    _LOGGER.error("Obico API health check failed")
+                    self.breaker.record_failure()
+                    return False
+                self.breaker.record_success()
+                return True
+        except Exception:
+            self.breaker.record_failure()
+            return False
+
+    def record_latency(self, latency_ms: float) -> None:
+        """Fold a successful request's duration into the EWMA."""
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += EWMA_ALPHA * (latency_ms - self.latency_ms)
+
+    async def _async_close_on_stop(self, _event: Event) -> None:
+        self._unsub_close = None
+        await self.session.close()
+
+    async def async_close(self) -> None:
+        if self._unsub_close is not None:
+            self._unsub_close()
+            self._unsub_close = None
+        await self.session.close()
+
+
+def async_acquire_server(hass: HomeAssistant, url: str) -> ObicoServer:
+    """Return the shared ObicoServer for ``url``'s base URL, counting a user."""
+    servers = hass.data.setdefault(DATA_SERVERS, {})
+    key = base_url(url)
+    if (server := servers.get(key)) is None:
+        settings = hass.data.get(DATA_SETTINGS, {})
+        server = servers[key] = ObicoServer(
+            hass,
+            key,
+            settings.get(
+                CONF_MAX_CONNECTIONS_PER_SERVER, DEFAULT_MAX_CONNECTIONS_PER_SERVER
+            ),
+        )
+    server.users += 1
+    return server
+
+
+async def async_release_server(hass: HomeAssistant, server: ObicoServer) -> None:
+    """Drop a user of ``server`` and close its session once unused."""
+    server.users -= 1
+    if server.users <= 0:
+        hass.data.get(DATA_SERVERS, {}).pop(server.base_url, None)
+        await server.async_close()
+
+
+class ObicoApiClient:
+    """Talks to one Obico ML server.
+
+    The binary transport posts the raw JPEG as ``application/octet-stream``
+    with the detection parameters in the query string, and accepts the
+    annotated image back as a raw ``image/*`` part of a ``multipart/mixed``
+    response. Servers without binary support are detected on the first
+    request and the client falls back to the base64-in-JSON contract.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        url: str,
+        transport: str = TRANSPORT_AUTO,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+    ):
+        self.hass = hass
+        self.url = url
+        self.transport = transport
+        self._binary_supported = transport != TRANSPORT_JSON
+        self.server = async_acquire_server(hass, url)
+        self._released = False
+        self.connect_timeout = connect_timeout
+        # sock_connect, not connect: the latter also counts the wait for a
+        # free pooled connection, so queueing alone would trip the breaker
+        self.timeout = aiohttp.ClientTimeout(
+            sock_connect=connect_timeout, sock_read=read_timeout
+        )
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self.server.breaker
+
+    @property
+    def active_transport(self) -> str:
+        """Transport used for the next request."""
+        return TRANSPORT_BINARY if self._binary_supported else TRANSPORT_JSON
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        return self.server.session
+
+    async def async_health_check(self) -> bool:
+        """Return True if the server answers GET /hc with 200."""
+        return await self.server.async_health_check(self.connect_timeout)
+
+    async def async_close(self) -> None:
+        """Release this client's share of the pooled server connection."""
+        if not self._released:
+            self._released = True
+            await async_release_server(self.hass, self.server)
+
+    async def async_check_connected(self, idle_after: float) -> bool:
+        """Report connectivity, probing /hc only when there is no fresh evidence.
+
+        Detection traffic within ``idle_after`` seconds counts as a successful
+        health check. While the breaker is open the server is reported down
+        without probing; the probe cadence therefore stretches with the
+        breaker's backoff.
+        """
+        if self.breaker.succeeded_within(idle_after):
+            return True
+        if self.breaker.state == BREAKER_OPEN:
+            return False
+        return await self.async_health_check()
+
+    async def async_detect(
+        self, image: bytes, threshold: float, return_annotated: bool = True
+    ) -> DetectionResult:
+        """Run detection on a single frame, failing fast while the server is down."""
+        self.breaker.raise_if_open()
+        try:
+            result = await self._async_detect(image, threshold, return_annotated)
+        except ObicoApiError as err:
+            # A 4xx still proves the server is up
+            if err.status >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def _async_detect(
+        self, image: bytes, threshold: float, return_annotated: bool
+    ) -> DetectionResult:
+        if self._binary_supported:
+            try:
+                return await self._async_detect_binary(
+                    image, threshold, return_annotated
+                )
+            except ObicoApiError as err:
+                if (
+                    self.transport != TRANSPORT_AUTO
+                    or err.status not in BINARY_UNSUPPORTED_STATUS
+                ):
+                    raise
+                _LOGGER.info(
+                    "%s does not accept binary uploads (%s), using JSON transport",
+                    self.url,
+                    err.status,
+                )
+                self._binary_supported = False
+
+        return await self._async_detect_json(image, threshold, return_annotated)
+
+    async def _async_detect_json(
+        self, image: bytes, threshold: float, return_annotated: bool
+    ) -> DetectionResult:
+        """Send the frame base64-encoded inside a JSON body."""
+        start = time.perf_counter()
+        image_b64 = await async_b64encode(self.hass, image)
+        body = await async_run_cpu(
+            self.hass,
+            len(image_b64),
+            _encode_json_payload,
+            image_b64,
+            threshold,
+            return_annotated,
+        )
+        encoded = time.perf_counter()
+        upload_bytes = len(body)
+        async with self.session.post(
+            self.url,
+            data=body,
+            headers={hdrs.CONTENT_TYPE: "application/json"},
+            timeout=self.timeout,
+        ) as response:
+            if response.status != 200:
+                raise ObicoApiError(response.status, await response.text())
+            body = await response.read()
+        received = time.perf_counter()
+        result = await async_run_cpu(self.hass, len(body), _decode_detection_body, body)
+        result.timings = {
+            STAGE_ENCODE: round((encoded - start) * 1000, 2),
+            STAGE_REQUEST: round((received - encoded) * 1000, 2),
+            STAGE_DECODE: _elapsed_ms(received),
+        }
+        result.upload_bytes = upload_bytes
+        result.response_bytes = len(body)
+        return result
+
+    async def _async_detect_binary(
+        self, image: bytes, threshold: float, return_annotated: bool
+    ) -> DetectionResult:
+        """Send the raw frame and accept a raw annotated image back."""
+        params = {
+            "threshold": str(threshold),
+            "return_annotated": "true" if return_annotated else "false",
+            "nms": str(DEFAULT_NMS),
+        }
+        headers = {
+            hdrs.CONTENT_TYPE: "application/octet-stream",
+            hdrs.ACCEPT: "multipart/mixed, application/json",
+        }
+        annotated_image = None
+        start = time.perf_counter()
+        async with self.session.post(
+            self.url, data=image, params=params, headers=headers, timeout=self.timeout
+        ) as response:
+            if response.status != 200:
+                raise ObicoApiError(response.status, await response.text())
+            if response.content_type.startswith("multipart/"):
+                body, annotated_image = await self._async_read_multipart(response)
+            else:
+                body = await response.read()
+        received = time.perf_counter()
+        result = await async_run_cpu(
+            self.hass, len(body), _decode_detection_body, body, annotated_image
+        )
+        result.timings = {
+            STAGE_ENCODE: 0.0,
+            STAGE_REQUEST: round((received - start) * 1000, 2),
+            STAGE_DECODE: _elapsed_ms(received),
+        }
+        result.upload_bytes = len(image)
+        result.response_bytes = len(body) + len(annotated_image or b"")
+        return result
+
+    @staticmethod
+    async def _async_read_multipart(
+        response: aiohttp.ClientResponse,
+    ) -> tuple[bytes, bytes | None]:
+        """Split a multipart response into its raw JSON and image parts."""
+        body = b"{}"
+        annotated_image = None
+        reader = aiohttp.MultipartReader.from_response(response)
+        while (part := await reader.next()) is not None:
+            content_type = part.headers.get(hdrs.CONTENT_TYPE, "")
+            if content_type.startswith("application/json"):
+                body = bytes(await part.read(decode=True))
+            elif content_type.startswith("image/"):
+                annotated_image = bytes(await part.read(decode=True))
+        return body, annotated_image
+
+
+class ObicoBatcher:
+    """Collects frames bound for one server and sends them as one request.
+
+    The first frame queued opens a collection window; everything queued
+    before it closes (or until ``BATCH_MAX_SIZE`` frames are waiting) goes out
+    as a single ``POST <url>/batch`` and the per-frame results are handed
+    back to each caller. Servers without a batch endpoint are detected on the
+    first attempt and every frame is then sent on its own.
+
+    Callers wait in the window while holding the integration-wide detection
+    semaphore, so a batch never holds more than ``max_concurrent_detections``
+    frames, whatever ``BATCH_MAX_SIZE`` allows.
+    """
+
+    def __init__(self, hass: HomeAssistant, url: str):
+        self.hass = hass
+        self.url = url
+        self._batch_supported = True
+        self._pending: list[
+            tuple[ObicoApiClient, bytes, float, bool, asyncio.Future]
+        ] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    @property
+    def batch_url(self) -> str:
+        return f"{self.url}/batch"
+
+    async def async_detect(
+        self,
+        client: ObicoApiClient,
+        image: bytes,
+        threshold: float,
+        window: float,
+        return_annotated: bool = True,
+    ) -> DetectionResult:
+        """Queue a frame for the next batch and wait for its result."""
+        client.breaker.raise_if_open()
+        if not self._batch_supported:
+            return await client.async_detect(image, threshold, return_annotated)
+
+        future = self.hass.loop.create_future()
+        self._pending.append((client, image, threshold, return_annotated, future))
+        if len(self._pending) >= BATCH_MAX_SIZE:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_later(window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Close the collection window and send what has been queued."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self.hass.async_create_task(self._async_send(batch))
+
+    async def _async_send(self, batch) -> None:
+        if len(batch) == 1:
+            await self._async_send_single(batch)
+            return
+
+        # Every client in a batch targets the same server, session and breaker
+        client = batch[0][0]
+        try:
+            start = time.perf_counter()
+            encoded_images = await asyncio.gather(
+                *(async_b64encode(self.hass, image) for _, image, *_ in batch)
+            )
+            frames = [
+                (image_b64, threshold, return_annotated)
+                for image_b64, (_, _, threshold, return_annotated, _) in zip(
+                    encoded_images, batch
+                )
+            ]
+            body = await async_run_cpu(
+                self.hass,
+                sum(len(frame[0]) for frame in frames),
+                _encode_batch_payload,
+                frames,
+            )
+            encoded = time.perf_counter()
+            upload_bytes = len(body)
+            async with client.session.post(
+                self.batch_url,
+                data=body,
+                headers={hdrs.CONTENT_TYPE: "application/json"},
+                timeout=client.timeout,
+            ) as response:
+                if response.status in (404, 405):
+                    _LOGGER.info(
+                        "%s has no batch endpoint, sending frames one by one",
+                        self.url,
+                    )
+                    self._batch_supported = False
+                elif response.status != 200:
+                    raise ObicoApiError(response.status, await response.text())
+                else:
+                    body = await response.read()
+            if self._batch_supported:
+                received = time.perf_counter()
+                results = await async_run_cpu(
+                    self.hass, len(body), _decode_batch_body, body
+                )
+                # Stage times are shared by the batch, payload sizes split
+                timings = {
+                    STAGE_ENCODE: round((encoded - start) * 1000, 2),
+                    STAGE_REQUEST: round((received - encoded) * 1000, 2),
+                    STAGE_DECODE: _elapsed_ms(received),
+                }
+                for result in results:
+                    result.timings = timings
+                    result.upload_bytes = upload_bytes // len(batch)
+                    result.response_bytes = len(body) // len(batch)
+        except Exception as err:
+            if not isinstance(err, ObicoApiError) or err.status >= 500:
+                client.breaker.record_failure()
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        client.breaker.record_success()
+
+        if not self._batch_supported:
+            await asyncio.gather(*(self._async_send_single([item]) for item in batch))
+            return
+
+        if len(results) != len(batch):
+            err = ObicoApiError(
+                200, f"batch returned {len(results)} results for {len(batch)} frames"
+            )
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        for (*_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    async def _async_send_single(batch) -> None:
+        client, image, threshold, return_annotated, future = batch[0]
+        try:
+            result = await client.async_detect(image, threshold, return_annotated)
+        except Exception as err:
+            if not future.done():
+                future.set_exception(err)
+        else:
+            if not future.done():
+                future.set_result(result)
+
+
+def async_get_batcher(hass: HomeAssistant, url: str) -> ObicoBatcher:
+    """Return the batcher shared by all entries targeting ``url``."""
+    batchers = hass.data.setdefault(DATA_BATCHERS, {})
+    if url not in batchers:
+        batchers[url] = ObicoBatcher(hass, url)
+    return batchers[url]
+
+
+def _can_fail_over(err: BaseException) -> bool:
+    """Return True if another endpoint might succeed where this one failed."""
+    if isinstance(err, ObicoApiError):
+        return isinstance(err, ObicoUnavailableError) or err.status >= 500
+    return isinstance(err, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+class ObicoEndpointPool:
+    """Routes detections across one or more /detect endpoints.
+
+    Each request goes to the available endpoint with the lowest expected
+    wait: its EWMA latency scaled by the requests already in flight on it,
+    both shared by all entries using that server. Endpoints whose breaker is
+    open are skipped and half-open ones are only used once the healthy ones
+    are exhausted. Connection errors, timeouts and 5xx responses fail over to
+    the next endpoint. With ``hedge_after_ms`` set, a second endpoint is also
+    asked once the first has not answered in time, and the first response
+    wins.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        urls: list[str],
+        transport: str = TRANSPORT_AUTO,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        batch_window_ms: int = 0,
+        hedge_after_ms: int = 0,
+    ):
+        self.hass = hass
+        self.transport = transport
+        self.clients = [
+            ObicoApiClient(hass, url, transport, connect_timeout, read_timeout)
+            for url in dict.fromkeys(urls)
+        ]
+        self._batch_window = batch_window_ms / 1000
+        self._hedge_after = hedge_after_ms / 1000 or None
+        self._last_client = self.clients[0]
+
+    @property
+    def primary(self) -> ObicoApiClient:
+        return self.clients[0]
+
+    @property
+    def state(self) -> str:
+        """Best breaker state among the endpoints."""
+        states = {client.breaker.state for client in self.clients}
+        for state in (BREAKER_CLOSED, BREAKER_HALF_OPEN):
+            if state in states:
+                return state
+        return BREAKER_OPEN
+
+    @property
+    def retry_in(self) -> float:
+        return min(client.breaker.retry_in for client in self.clients)
+
+    @property
+    def active_transport(self) -> str:
+        """Transport of the endpoint that served the last request."""
+        return self._last_client.active_transport
+
+    async def async_check_connected(self, idle_after: float) -> bool:
+        """Return True if at least one endpoint is reachable."""
+        results = await asyncio.gather(
+            *(client.async_check_connected(idle_after) for client in self.clients)
+        )
+        return any(results)
+
+    async def async_close(self) -> None:
+        await asyncio.gather(*(client.async_close() for client in self.clients))
+
+    def _ranked(self) -> list[ObicoApiClient]:
+        """Return usable endpoints, best first."""
+
+        def score(client: ObicoApiClient) -> tuple:
+            server = client.server
+            return (
+                client.breaker.state != BREAKER_CLOSED,
+                (server.latency_ms or 0) * (server.in_flight + 1),
+                server.in_flight,
+            )
+
+        return sorted(
+            (client for client in self.clients if client.breaker.state != BREAKER_OPEN),
+            key=score,
+        )
+
+    async def async_detect(
+        self, image: bytes, threshold: float, return_annotated: bool = True
+    ) -> DetectionResult:
+        """Run detection on the best endpoint, failing over or hedging."""
+        candidates = self._ranked()
+        if not candidates:
+            raise ObicoUnavailableError(self.retry_in)
+        if len(candidates) == 1:
+            return await self._async_detect_on(
+                candidates[0], image, threshold, return_annotated
+            )
+
+        error: BaseException | None = None
+        pending: set[asyncio.Task] = set()
+        try:
+            for index, client in enumerate(candidates):
+                pending.add(
+                    self.hass.async_create_task(
+                        self._async_detect_on(
+                            client, image, threshold, return_annotated
+                        )
+                    )
+                )
+                # Only hedge while there is another endpoint left to ask
+                timeout = self._hedge_after if index + 1 < len(candidates) else None
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if not done:
+                        _LOGGER.debug(
+                            "%s slower than %s s, hedging on the next endpoint",
+                            client.url,
+                            self._hedge_after,
+                        )
+                        break
+                    for task in done:
+                        if (err := task.exception()) is None:
+                            return task.result()
+                        if not _can_fail_over(err):
+                            raise err
+                        _LOGGER.debug("Obico endpoint failed, failing over: %s", err)
+                        error = err
+        finally:
+            for task in pending:
+                task.cancel()
+        raise error
+
+    async def _async_detect_on(
+        self,
+        client: ObicoApiClient,
+        image: bytes,
+        threshold: float,
+        return_annotated: bool,
+    ) -> DetectionResult:
+        server = client.server
+        server.in_flight += 1
+        start = time.perf_counter()
+        try:
+            if self._batch_window:
+                result = await async_get_batcher(self.hass, client.url).async_detect(
+                    client, image, threshold, self._batch_window, return_annotated
+                )
+            else:
+                result = await client.async_detect(image, threshold, return_annotated)
+        finally:
+            server.in_flight -= 1
+        server.record_latency((time.perf_counter() - start) * 1000)
+        self._last_client = client
+        return result
@@ -11,6 +11,10 @@ from .const import (
     ATTR_AVG_CONFIDENCE,
     ATTR_API_CONNECTED,
     ATTR_LAST_DETECTION,
+    ATTR_FRAME_FETCH_MS,
+    ATTR_FRAME_SOURCE,
+    ATTR_TRANSPORT,
+    ATTR_CIRCUIT_STATE,
 )
 from .coordinator import ObicoEntity
 
@@ -41,6 +45,13 @@ class ObicoConnectivitySensor(ObicoEntity, BinarySensorEntity):
     def is_on(self) -> bool:
         return self.coordinator.data.get(ATTR_API_CONNECTED, False)
 
+    @property
+    def extra_state_attributes(self):
+        return {
+            "transport": self.coordinator.data.get(ATTR_TRANSPORT),
+            "circuit_state": self.coordinator.data.get(ATTR_CIRCUIT_STATE),
+        }
+
 
 class ObicoBinarySensor(ObicoEntity, BinarySensorEntity, RestoreEntity):
     """Binary sensor for 3D print error detection (Restores state)."""
@@ -71,6 +82,8 @@ class ObicoBinarySensor(ObicoEntity, BinarySensorEntity, RestoreEntity):
             "inference_ms": data.get(ATTR_INFERENCE_MS),
             "provider": data.get(ATTR_PROVIDER),
             "last_run": data.get(ATTR_LAST_DETECTION),
+            "frame_fetch_ms": data.get(ATTR_FRAME_FETCH_MS),
+            "frame_source": data.get(ATTR_FRAME_SOURCE),
         }
 
     async def async_added_to_hass(self):
@@ -82,7 +95,9 @@ class ObicoBinarySensor(ObicoEntity, BinarySensorEntity, RestoreEntity):
             # but usually, we just let the sensor report the old state until the first update.
             # Here, since is_on depends on coordinator.data, we might want to seed coordinator.data
             # IF it is currently empty.
-            if self.coordinator.data.get(ATTR_LAST_DETECTION) is None:
+            # Only without a saved result; checking a data field instead would
+            # see values other entities already seeded from their own state
+            if not self.coordinator.restored_from_store:
                 # Attempt to restore partial data to coordinator so all sensors show consistent "last known"
                 self.coordinator.data[ATTR_ERROR_DETECTED] = state.state == "on"
                 self.coordinator.data[ATTR_LAST_DETECTION] = state.attributes.get(
@@ -1,7 +1,6 @@
 from homeassistant.components.camera import Camera
 from .const import (
     DOMAIN,
-    ATTR_IMAGE_WITH_ERRORS,
     ATTR_AVG_CONFIDENCE,
     ATTR_LAST_DETECTION,
 )
@@ -30,9 +29,7 @@ class ObicoCamera(ObicoEntity, Camera):
         self, width: int | None = None, height: int | None = None
     ) -> bytes | None:
         """Return the latest image with error detections."""
-        if self.coordinator.data:
-            return self.coordinator.data.get(ATTR_IMAGE_WITH_ERRORS)
-        return None
+        return await self.coordinator.async_get_image(width, height)
 
     @property
     def extra_state_attributes(self):
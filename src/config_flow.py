@@ -4,19 +4,67 @@ from homeassistant.core import callback
 from homeassistant.helpers import selector
 import logging
 
+from .imaging import parse_roi
 from .const import (
     DOMAIN,
     DEFAULT_INTERVAL,
     DEFAULT_THRESHOLD,
     DEFAULT_URL,
     CONF_URL,
+    CONF_EXTRA_URLS,
+    CONF_HEDGE_AFTER_MS,
     CONF_INTERVAL,
     CONF_CAMERA_ENTITY,
     CONF_THRESHOLD,
+    CONF_TRANSPORT,
+    CONF_RERUN_IF_BUSY,
+    CONF_BATCH_WINDOW_MS,
+    CONF_CHANGE_THRESHOLD,
+    CONF_ROI,
+    CONF_RESIZE_LONG_EDGE,
+    CONF_JPEG_QUALITY,
+    CONF_LOCAL_ANNOTATION,
+    CONF_LOCAL_THRESHOLD,
+    CONF_AUTO_DETECT,
+    CONF_MIN_DETECTION_INTERVAL,
+    CONF_MAX_DETECTION_INTERVAL,
+    CONF_DETECTION_INTERVAL_FACTOR,
+    CONF_PRINTER_ENTITY,
+    CONF_ACTIVE_STATES,
+    CONF_DETECT_ON_NEW_FRAME,
+    CONF_MIN_FRAME_GAP,
+    CONF_CONNECT_TIMEOUT,
+    CONF_READ_TIMEOUT,
+    DEFAULT_TRANSPORT,
+    DEFAULT_MIN_DETECTION_INTERVAL,
+    DEFAULT_MAX_DETECTION_INTERVAL,
+    DEFAULT_DETECTION_INTERVAL_FACTOR,
+    DEFAULT_ACTIVE_STATES,
+    DEFAULT_MIN_FRAME_GAP,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    TRANSPORTS,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+PRINTER_ENTITY_SELECTOR = selector.EntitySelector(
+    selector.EntitySelectorConfig(domain=["sensor", "binary_sensor", "select"])
+)
+EXTRA_URLS_SELECTOR = selector.TextSelector(
+    selector.TextSelectorConfig(type=selector.TextSelectorType.URL, multiple=True)
+)
+ACTIVE_STATES_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=DEFAULT_ACTIVE_STATES, multiple=True, custom_value=True
+    )
+)
+
+
+def _clean_urls(urls: list[str] | None) -> list[str]:
+    """Drop empty entries and trailing slashes from additional endpoints."""
+    return [url.strip().rstrip("/") for url in urls or [] if url.strip()]
+
 
 class ObicoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
@@ -31,6 +79,7 @@ class ObicoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
             # Save the sanitized URL back to user_input so it is stored cleanly
             user_input[CONF_URL] = url
+            user_input[CONF_EXTRA_URLS] = _clean_urls(user_input.get(CONF_EXTRA_URLS))
 
             # 2. Generate Unique ID
             # Composite ID allows monitoring the same camera with DIFFERENT API hosts,
@@ -48,6 +97,7 @@ class ObicoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         data_schema = vol.Schema(
             {
                 vol.Required(CONF_URL, default=DEFAULT_URL): str,
+                vol.Optional(CONF_EXTRA_URLS): EXTRA_URLS_SELECTOR,
                 vol.Required(CONF_INTERVAL, default=DEFAULT_INTERVAL): vol.All(
                     vol.Coerce(int), vol.Range(min=5)
                 ),
@@ -66,6 +116,11 @@ class ObicoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         mode=selector.NumberSelectorMode.SLIDER,
                     )
                 ),
+                vol.Optional(CONF_AUTO_DETECT, default=False): bool,
+                vol.Optional(CONF_PRINTER_ENTITY): PRINTER_ENTITY_SELECTOR,
+                vol.Optional(
+                    CONF_ACTIVE_STATES, default=DEFAULT_ACTIVE_STATES
+                ): ACTIVE_STATES_SELECTOR,
             }
         )
 
@@ -84,9 +139,18 @@ class ObicoOptionsFlow(config_entries.OptionsFlow):
         self.config_entry = config_entry
 
     async def async_step_init(self, user_input=None):
+        errors = {}
         if user_input is not None:
-            # Update the entry with the new options
-            return self.async_create_entry(title="", data=user_input)
+            try:
+                parse_roi(user_input.get(CONF_ROI))
+            except ValueError:
+                errors[CONF_ROI] = "invalid_roi"
+            else:
+                user_input[CONF_EXTRA_URLS] = _clean_urls(
+                    user_input.get(CONF_EXTRA_URLS)
+                )
+                # Update the entry with the new options
+                return self.async_create_entry(title="", data=user_input)
 
         # Load current values from options if available, else fall back to data
         current_url = self.config_entry.options.get(
@@ -98,10 +162,68 @@ class ObicoOptionsFlow(config_entries.OptionsFlow):
         current_threshold = self.config_entry.options.get(
             CONF_THRESHOLD, self.config_entry.data.get(CONF_THRESHOLD)
         )
+        current_transport = self.config_entry.options.get(
+            CONF_TRANSPORT, DEFAULT_TRANSPORT
+        )
+        current_rerun_if_busy = self.config_entry.options.get(CONF_RERUN_IF_BUSY, False)
+        current_batch_window_ms = self.config_entry.options.get(CONF_BATCH_WINDOW_MS, 0)
+        current_change_threshold = self.config_entry.options.get(
+            CONF_CHANGE_THRESHOLD, 0
+        )
+        current_roi = self.config_entry.options.get(CONF_ROI, "")
+        current_resize_long_edge = self.config_entry.options.get(
+            CONF_RESIZE_LONG_EDGE, 0
+        )
+        current_jpeg_quality = self.config_entry.options.get(CONF_JPEG_QUALITY, 0)
+        current_local_annotation = self.config_entry.options.get(
+            CONF_LOCAL_ANNOTATION, False
+        )
+        current_local_threshold = self.config_entry.options.get(
+            CONF_LOCAL_THRESHOLD, False
+        )
+        # Values chosen at setup apply until the options are first saved; after
+        # that a cleared printer entity is absent from them and stays cleared
+        automation_config = self.config_entry.options or self.config_entry.data
+        current_auto_detect = automation_config.get(CONF_AUTO_DETECT, False)
+        current_min_interval = self.config_entry.options.get(
+            CONF_MIN_DETECTION_INTERVAL, DEFAULT_MIN_DETECTION_INTERVAL
+        )
+        current_max_interval = self.config_entry.options.get(
+            CONF_MAX_DETECTION_INTERVAL, DEFAULT_MAX_DETECTION_INTERVAL
+        )
+        current_interval_factor = self.config_entry.options.get(
+            CONF_DETECTION_INTERVAL_FACTOR, DEFAULT_DETECTION_INTERVAL_FACTOR
+        )
+        current_printer_entity = automation_config.get(CONF_PRINTER_ENTITY)
+        current_active_states = automation_config.get(
+            CONF_ACTIVE_STATES, DEFAULT_ACTIVE_STATES
+        )
+        current_detect_on_new_frame = self.config_entry.options.get(
+            CONF_DETECT_ON_NEW_FRAME, False
+        )
+        current_min_frame_gap = self.config_entry.options.get(
+            CONF_MIN_FRAME_GAP, DEFAULT_MIN_FRAME_GAP
+        )
+        current_connect_timeout = self.config_entry.options.get(
+            CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT
+        )
+        current_read_timeout = self.config_entry.options.get(
+            CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT
+        )
+        current_extra_urls = self.config_entry.options.get(
+            CONF_EXTRA_URLS, self.config_entry.data.get(CONF_EXTRA_URLS, [])
+        )
+        current_hedge_after_ms = self.config_entry.options.get(CONF_HEDGE_AFTER_MS, 0)
 
         schema = vol.Schema(
             {
                 vol.Required(CONF_URL, default=current_url): str,
+                vol.Optional(
+                    CONF_EXTRA_URLS, default=current_extra_urls
+                ): EXTRA_URLS_SELECTOR,
+                vol.Optional(
+                    CONF_HEDGE_AFTER_MS, default=current_hedge_after_ms
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=60000)),
                 vol.Required(CONF_INTERVAL, default=current_interval): vol.All(
                     vol.Coerce(int), vol.Range(min=2)
                 ),
@@ -115,7 +237,85 @@ class ObicoOptionsFlow(config_entries.OptionsFlow):
                         mode=selector.NumberSelectorMode.SLIDER,
                     )
                 ),
+                vol.Optional(
+                    CONF_TRANSPORT, default=current_transport
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=TRANSPORTS,
+                        translation_key=CONF_TRANSPORT,
+                        mode=selector.SelectSelectorMode.DROPDOWN,
+                    )
+                ),
+                vol.Optional(
+                    CONF_RERUN_IF_BUSY, default=current_rerun_if_busy
+                ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_BATCH_WINDOW_MS, default=current_batch_window_ms
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=2000)),
+                vol.Optional(
+                    CONF_CHANGE_THRESHOLD, default=current_change_threshold
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0.0,
+                        max=25.0,
+                        step=0.5,
+                        unit_of_measurement="%",
+                        mode=selector.NumberSelectorMode.SLIDER,
+                    )
+                ),
+                vol.Optional(CONF_ROI, default=current_roi): str,
+                vol.Optional(
+                    CONF_RESIZE_LONG_EDGE, default=current_resize_long_edge
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=4096)),
+                vol.Optional(CONF_JPEG_QUALITY, default=current_jpeg_quality): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=100)
+                ),
+                vol.Optional(
+                    CONF_LOCAL_ANNOTATION, default=current_local_annotation
+                ): bool,
+                vol.Optional(
+                    CONF_LOCAL_THRESHOLD, default=current_local_threshold
+                ): bool,
+                vol.Optional(
+                    CONF_AUTO_DETECT, default=current_auto_detect
+                ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_MIN_DETECTION_INTERVAL, default=current_min_interval
+                ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+                vol.Optional(
+                    CONF_MAX_DETECTION_INTERVAL, default=current_max_interval
+                ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+                vol.Optional(
+                    CONF_DETECTION_INTERVAL_FACTOR, default=current_interval_factor
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=1.0,
+                        max=4.0,
+                        step=0.1,
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                # suggested_value (not default) so the entity can be cleared
+                vol.Optional(
+                    CONF_PRINTER_ENTITY,
+                    description={"suggested_value": current_printer_entity},
+                ): PRINTER_ENTITY_SELECTOR,
+                vol.Optional(
+                    CONF_ACTIVE_STATES, default=current_active_states
+                ): ACTIVE_STATES_SELECTOR,
+                vol.Optional(
+                    CONF_DETECT_ON_NEW_FRAME, default=current_detect_on_new_frame
+                ): bool,
+                vol.Optional(
+                    CONF_MIN_FRAME_GAP, default=current_min_frame_gap
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
+                vol.Optional(
+                    CONF_CONNECT_TIMEOUT, default=current_connect_timeout
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.5, max=60)),
+                vol.Optional(CONF_READ_TIMEOUT, default=current_read_timeout): vol.All(
+                    vol.Coerce(float), vol.Range(min=1, max=300)
+                ),
             }
         )
 
-        return self.async_show_form(step_id="init", data_schema=schema)
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
@@ -5,18 +5,87 @@ PLATFORMS = ["binary_sensor", "button", "camera", "sensor"]
 DEFAULT_URL = "http://IP_OR_HOSTNAME:3333/detect"
 DEFAULT_INTERVAL = 60  # Check connectivity every 60s
 DEFAULT_THRESHOLD = 0.38  # Default confidence threshold
+DEFAULT_MAX_CONCURRENT_DETECTIONS = 4  # Integration-wide in-flight detections
+DEFAULT_MIN_DETECTION_INTERVAL = 15  # Fastest automatic detection cadence
+DEFAULT_MAX_DETECTION_INTERVAL = 300  # Slowest cadence while results stay clean
+DEFAULT_DETECTION_INTERVAL_FACTOR = 2.0  # Ramp applied per clean/rising result
+DEFAULT_ACTIVE_STATES = ["printing", "running"]  # Printer states that enable the loop
+DEFAULT_MIN_FRAME_GAP = 5  # Seconds between frame-triggered detections
+DEFAULT_CONNECT_TIMEOUT = 5  # ML server connect timeout (also bounds GET /hc)
+DEFAULT_READ_TIMEOUT = 20  # ML server socket read timeout for /detect
+DEFAULT_MAX_CONNECTIONS_PER_SERVER = 4  # Pooled connections per ML server
+DEFAULT_IMAGE_MEMORY_BUDGET_MB = 64  # Analyzed images kept across all entries
+DEFAULT_DOWNSCALE_UNVIEWED_AFTER = 0  # Seconds unviewed before downscaling, 0 = off
+DEFAULT_FRAME_CACHE_TTL = 1  # Seconds a fetched frame is shared with other entries
+THRESHOLD_FLOOR = 0.05  # Threshold sent to the server when filtering locally
 
 CONF_URL = "url"
+CONF_EXTRA_URLS = "extra_urls"
+CONF_HEDGE_AFTER_MS = "hedge_after_ms"
 CONF_INTERVAL = "interval"
 CONF_CAMERA_ENTITY = "camera_entity"
 CONF_THRESHOLD = "threshold"
+CONF_TRANSPORT = "transport"
+CONF_RERUN_IF_BUSY = "rerun_if_busy"
+CONF_MAX_CONCURRENT_DETECTIONS = "max_concurrent_detections"
+CONF_BATCH_WINDOW_MS = "batch_window_ms"
+CONF_CHANGE_THRESHOLD = "frame_change_threshold"
+CONF_ROI = "roi"
+CONF_RESIZE_LONG_EDGE = "resize_long_edge"
+CONF_JPEG_QUALITY = "jpeg_quality"
+CONF_LOCAL_ANNOTATION = "local_annotation"
+CONF_LOCAL_THRESHOLD = "local_threshold"
+CONF_AUTO_DETECT = "auto_detect"
+CONF_MIN_DETECTION_INTERVAL = "min_detection_interval"
+CONF_MAX_DETECTION_INTERVAL = "max_detection_interval"
+CONF_DETECTION_INTERVAL_FACTOR = "detection_interval_factor"
+CONF_PRINTER_ENTITY = "printer_entity"
+CONF_ACTIVE_STATES = "active_states"
+CONF_DETECT_ON_NEW_FRAME = "detect_on_new_frame"
+CONF_MIN_FRAME_GAP = "min_frame_gap"
+CONF_CONNECT_TIMEOUT = "connect_timeout"
+CONF_READ_TIMEOUT = "read_timeout"
+CONF_MAX_CONNECTIONS_PER_SERVER = "max_connections_per_server"
+CONF_IMAGE_MEMORY_BUDGET_MB = "image_memory_budget_mb"
+CONF_DOWNSCALE_UNVIEWED_AFTER = "downscale_unviewed_after"
+CONF_FRAME_CACHE_TTL = "frame_cache_ttl"
+
+# hass.data keys for integration-wide state (hass.data[DOMAIN] holds coordinators)
+DATA_DETECTION_SEMAPHORE = f"{DOMAIN}_detection_semaphore"
+DATA_BATCHERS = f"{DOMAIN}_batchers"
+DATA_SERVERS = f"{DOMAIN}_servers"
+DATA_SETTINGS = f"{DOMAIN}_settings"
+DATA_IMAGE_STORE = f"{DOMAIN}_image_store"
+DATA_FRAME_CACHE = f"{DOMAIN}_frame_cache"
+
+TRANSPORT_AUTO = "auto"
+TRANSPORT_BINARY = "binary"
+TRANSPORT_JSON = "json"
+TRANSPORTS = [TRANSPORT_AUTO, TRANSPORT_BINARY, TRANSPORT_JSON]
+DEFAULT_TRANSPORT = TRANSPORT_AUTO
 
 ATTR_AVG_CONFIDENCE = "avg_confidence"
 ATTR_ERROR_DETECTED = "error_detected"
-ATTR_IMAGE_WITH_ERRORS = "image_with_errors"
 ATTR_INFERENCE_MS = "inference_ms"
 ATTR_PROVIDER = "provider"
 ATTR_API_CONNECTED = "api_connected"
 ATTR_LAST_DETECTION = "last_detection_timestamp"
+ATTR_FRAME_FETCH_MS = "frame_fetch_ms"
+ATTR_FRAME_SOURCE = "frame_source"
+ATTR_TRANSPORT = "transport"
+ATTR_INFERENCES_RUN = "inferences_run"
+ATTR_INFERENCES_SKIPPED = "inferences_skipped"
+ATTR_DETECTIONS = "detections"
+ATTR_RAW_DETECTIONS = "raw_detections"
+ATTR_DETECTION_INTERVAL = "detection_interval"
+ATTR_CIRCUIT_STATE = "circuit_state"
+ATTR_LOOP_BLOCKING_MS = "loop_blocking_ms"
+ATTR_FRAMES_DROPPED = "frames_dropped"
 
 SERVICE_TRIGGER_DETECTION = "trigger_detection"
+SERVICE_ANALYZE_FILES = "analyze_files"
+
+ATTR_PATH = "path"
+ATTR_OUTPUT = "output"
+ATTR_CONCURRENCY = "concurrency"
+DEFAULT_ANALYSIS_CONCURRENCY = 4
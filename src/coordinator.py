@@ -1,32 +1,123 @@
-import base64
+import asyncio
+import hashlib
 import logging
+import time
 from datetime import datetime
 from datetime import timedelta
 
-import async_timeout
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change_event,
+)
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.network import get_url
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     CoordinatorEntity,
 )
 
+from .api import (
+    BREAKER_OPEN,
+    DetectionResult,
+    ObicoEndpointPool,
+    ObicoApiError,
+    ObicoUnavailableError,
+)
 from .const import (
     DOMAIN,
+    TRANSPORT_AUTO,
+    DEFAULT_MIN_DETECTION_INTERVAL,
+    DEFAULT_MAX_DETECTION_INTERVAL,
+    DEFAULT_DETECTION_INTERVAL_FACTOR,
+    DEFAULT_ACTIVE_STATES,
+    DEFAULT_MIN_FRAME_GAP,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    THRESHOLD_FLOOR,
     ATTR_ERROR_DETECTED,
-    ATTR_IMAGE_WITH_ERRORS,
     ATTR_INFERENCE_MS,
     ATTR_PROVIDER,
     ATTR_AVG_CONFIDENCE,
     ATTR_API_CONNECTED,
     ATTR_LAST_DETECTION,
+    ATTR_FRAME_FETCH_MS,
+    ATTR_FRAME_SOURCE,
+    ATTR_TRANSPORT,
+    ATTR_INFERENCES_RUN,
+    ATTR_INFERENCES_SKIPPED,
+    ATTR_DETECTIONS,
+    ATTR_DETECTION_INTERVAL,
+    ATTR_CIRCUIT_STATE,
+    ATTR_LOOP_BLOCKING_MS,
+    ATTR_FRAMES_DROPPED,
+    ATTR_RAW_DETECTIONS,
+)
+from .frame_cache import ObicoFrameCache
+from .history import DetectionHistory
+from .image_store import LEVEL_FULL, ObicoImageStore
+from .persistence import ObicoResultStore
+from .metrics import (
+    PAYLOAD_FRAME,
+    PAYLOAD_RESPONSE,
+    PAYLOAD_UPLOAD,
+    STAGE_FETCH,
+    STAGE_FINGERPRINT,
+    STAGE_NETWORK,
+    STAGE_PREPROCESS,
+    STAGE_RENDER,
+    STAGE_REQUEST,
+    STAGE_SERVER,
+    STAGE_TOTAL,
+    LoopTimer,
+    RollingStats,
+)
+from .imaging import (
+    FrameSignature,
+    PreparedFrame,
+    frame_signature,
+    prepare_frame,
+    render_frame,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# Result fields written to disk and restored at setup
+PERSISTED_KEYS = (
+    ATTR_ERROR_DETECTED,
+    ATTR_DETECTIONS,
+    ATTR_RAW_DETECTIONS,
+    ATTR_AVG_CONFIDENCE,
+    ATTR_INFERENCE_MS,
+    ATTR_PROVIDER,
+    ATTR_LAST_DETECTION,
+    ATTR_INFERENCES_RUN,
+    ATTR_INFERENCES_SKIPPED,
+    ATTR_TRANSPORT,
+)
+
+
+def _average_confidence(detections: list) -> float:
+    """Mean confidence of ``detections`` in percent, 0 without detections."""
+    if not detections:
+        return 0
+    confidences = [d[1] for d in detections]
+    return round((sum(confidences) / len(confidences)) * 100, 2)
+
+
+def _peak_confidence(detections: list | None) -> float:
+    """Highest confidence among ``detections``, 0 without detections."""
+    return max((d[1] for d in detections or ()), default=0)
+
+
+def _as_ms(value) -> float:
+    """Coerce a server-reported duration to float, 0 if it is malformed."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
 
 class ObicoDataUpdateCoordinator(DataUpdateCoordinator):
     def __init__(
@@ -37,11 +128,107 @@ class ObicoDataUpdateCoordinator(DataUpdateCoordinator):
         camera_entity: str,
         interval: int,
         threshold: float,
+        transport: str = TRANSPORT_AUTO,
+        rerun_if_busy: bool = False,
+        detection_semaphore: asyncio.Semaphore | None = None,
+        batch_window_ms: int = 0,
+        change_threshold: float = 0,
+        roi: tuple[float, float, float, float] | None = None,
+        resize_long_edge: int = 0,
+        jpeg_quality: int = 0,
+        local_annotation: bool = False,
+        local_threshold: bool = False,
+        image_store: ObicoImageStore | None = None,
+        frame_cache: ObicoFrameCache | None = None,
+        auto_detect: bool = False,
+        min_interval: int = DEFAULT_MIN_DETECTION_INTERVAL,
+        max_interval: int = DEFAULT_MAX_DETECTION_INTERVAL,
+        interval_factor: float = DEFAULT_DETECTION_INTERVAL_FACTOR,
+        printer_entity: str | None = None,
+        active_states: list[str] = DEFAULT_ACTIVE_STATES,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        detect_on_new_frame: bool = False,
+        min_frame_gap: float = DEFAULT_MIN_FRAME_GAP,
+        extra_urls: list[str] | None = None,
+        hedge_after_ms: int = 0,
     ):
         self.config_entry = config_entry
         self._url = url
         self._camera_entity = camera_entity
         self._threshold = threshold
+        # Every configured endpoint; requests go to the best available one.
+        # Entries on the same server that trigger within the batch window
+        # share a request.
+        self._client = ObicoEndpointPool(
+            hass,
+            [url, *(extra_urls or [])],
+            transport,
+            connect_timeout,
+            read_timeout,
+            batch_window_ms,
+            hedge_after_ms,
+        )
+        self._rerun_if_busy = rerun_if_busy
+        self._rerun_pending = False
+        self._detection_task: asyncio.Task | None = None
+        # Shared by all entries to cap in-flight detections integration-wide
+        self._detection_semaphore = detection_semaphore or asyncio.Semaphore(1)
+        # Frames within this % of the last analyzed frame reuse its result
+        self._change_threshold = change_threshold
+        self._last_signature: FrameSignature | None = None
+        # Optional client-side crop/resize/re-encode before upload
+        self._roi = roi
+        self._resize_long_edge = resize_long_edge
+        self._jpeg_quality = jpeg_quality
+        # Draw boxes here, lazily per requested size, instead of on the server
+        self._local_annotation = local_annotation
+        self._render_locally = False
+        # Ask the server for everything above THRESHOLD_FLOOR and apply the
+        # threshold here, so changing it needs no new inference
+        self._local_threshold = local_threshold
+        # Latest analyzed image, kept within the integration-wide memory budget
+        self.image_store = image_store or ObicoImageStore(hass)
+        # Entries on the same camera share fetched frames and their encoding
+        self.frame_cache = frame_cache or ObicoFrameCache(hass)
+        self._image_key = config_entry.entry_id
+        # Last result survives restarts; the image is only read when viewed
+        self._result_store = ObicoResultStore(hass, config_entry.entry_id)
+        self._restored_image: dict | None = None
+        # True once async_restore() loaded a saved result; entities only fall
+        # back to their own last state when it did not
+        self.restored_from_store = False
+        # Rolling per-stage wall times (ms) and payload sizes (bytes)
+        self.stage_stats = RollingStats()
+        self.payload_stats = RollingStats()
+        self.history = DetectionHistory()
+        # Built-in adaptive detection loop
+        self._auto_detect = auto_detect
+        self._auto_detect_active = False
+        self._min_interval = min_interval
+        self._max_interval = max(max_interval, min_interval)
+        self._interval_factor = max(interval_factor, 1.0)
+        self._detection_interval = float(self._max_interval)
+        self._unsub_detection_timer: CALLBACK_TYPE | None = None
+        # Only run the loop while the printer entity is in an active state
+        self._printer_entity = printer_entity or None
+        self._active_states = {state.lower() for state in active_states}
+        self._unsub_printer_state: CALLBACK_TYPE | None = None
+        # Detect when the source entity publishes a new frame
+        self._detect_on_new_frame = detect_on_new_frame
+        self._min_frame_gap = min_frame_gap
+        self._last_frame_trigger = 0.0
+        self._unsub_camera_state: CALLBACK_TYPE | None = None
+        self._unsub_frame_gap_timer: CALLBACK_TYPE | None = None
+        # Entry data and options this coordinator was set up with
+        self.applied_settings: tuple[dict, dict] = ({}, {})
+        # Startup cost of this entry, for slow-startup reports
+        self.setup_ms: float | None = None
+        self.first_refresh_ms: float | None = None
+
+        # Stable per-entry phase in [0, 1) used to spread runs across entries
+        digest = hashlib.sha1(config_entry.entry_id.encode()).digest()
+        self._phase = int.from_bytes(digest[:4], "big") / 2**32
         super().__init__(
             hass,
             _LOGGER,
@@ -56,15 +243,62 @@ class ObicoDataUpdateCoordinator(DataUpdateCoordinator):
             ATTR_AVG_CONFIDENCE: 0,
             ATTR_INFERENCE_MS: 0,
             ATTR_PROVIDER: "unknown",
-            ATTR_IMAGE_WITH_ERRORS: None,
             ATTR_LAST_DETECTION: None,
+            ATTR_FRAME_FETCH_MS: None,
+            ATTR_FRAME_SOURCE: None,
+            ATTR_TRANSPORT: None,
+            ATTR_INFERENCES_RUN: 0,
+            ATTR_INFERENCES_SKIPPED: 0,
+            ATTR_DETECTIONS: [],
+            ATTR_RAW_DETECTIONS: None,
+            ATTR_DETECTION_INTERVAL: None,
+            ATTR_CIRCUIT_STATE: None,
+            ATTR_LOOP_BLOCKING_MS: None,
+            ATTR_FRAMES_DROPPED: 0,
         }
 
-    def update_config(self, url, interval, threshold):
-        """Update configuration on the fly."""
-        self._url = url
+    @property
+    def client(self) -> ObicoEndpointPool:
+        return self._client
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    def update_threshold(self, threshold: float) -> None:
+        """Apply a new threshold on the fly.
+
+        Anything else (URLs, intervals, transport) is bound to the pooled
+        server connections and needs the entry to be reloaded.
+        """
         self._threshold = threshold
-        self.update_interval = timedelta(seconds=interval)
+        self._last_signature = None
+        if self.data.get(ATTR_RAW_DETECTIONS) is not None:
+            self._apply_threshold()
+            self.async_set_updated_data(self.data)
+            self._result_store.async_schedule_save(
+                self._result_to_save, self._image_to_save
+            )
+
+    @property
+    def request_threshold(self) -> float:
+        """Threshold sent to the ML server."""
+        if self._local_threshold:
+            return min(self._threshold, THRESHOLD_FLOOR)
+        return self._threshold
+
+    def _above_threshold(self, detections: list) -> list:
+        return [d for d in detections if d[1] >= self._threshold]
+
+    def _apply_threshold(self) -> None:
+        """Derive the published result from the raw detections."""
+        detections = self._above_threshold(self.data[ATTR_RAW_DETECTIONS])
+        self.data[ATTR_DETECTIONS] = detections
+        self.data[ATTR_ERROR_DETECTED] = len(detections) > 0
+        self.data[ATTR_AVG_CONFIDENCE] = _average_confidence(detections)
+        # The stored image is the plain frame, boxes are always drawn here
+        self._render_locally = bool(detections)
+        self.image_store.async_drop_renders(self._image_key)
 
     async def _async_update_data(self):
         """Periodic connectivity check only. Does NOT trigger detection."""
@@ -72,114 +306,532 @@ class ObicoDataUpdateCoordinator(DataUpdateCoordinator):
         if self.data is None:
             self.data = {}
 
-        session = async_get_clientsession(self.hass)
+        # Passive: recent detection traffic counts, GET /hc only when idle
+        self.data[ATTR_API_CONNECTED] = await self._client.async_check_connected(
+            self.update_interval.total_seconds()
+        )
+        self.data[ATTR_CIRCUIT_STATE] = self._client.state
+        return self.data
 
-        # Simple health check (GET /hc)
-        # We assume the user provided URL is .../detect. We derive /hc from it.
+    async def async_trigger_detection(self):
+        """Manually trigger the heavy detection logic.
 
-        hc_url = self._url.split("/detect")[0]  # Base URL without /detect
-        hc_url = hc_url + "/hc"
-        try:
-            async with async_timeout.timeout(5):
-                async with session.get(hc_url) as response:
-                    if response.status != 200:
-                        _LOGGER.error("Obico API health check failed")
-                        self.data[ATTR_API_CONNECTED] = False
-                    else:
-                        self.data[ATTR_API_CONNECTED] = True
-        except Exception:
-            self.data[ATTR_API_CONNECTED] = False
+        Single-flight: callers arriving while a detection is in flight await
+        that run instead of starting their own. With ``rerun_if_busy`` set,
+        such a caller also schedules exactly one follow-up run and waits for
+        it, so it always sees a frame taken after it asked.
+        """
+        task = self._detection_task
+        if task is not None and not task.done():
+            _LOGGER.debug("Obico detection already in flight, joining it")
+            if self._rerun_if_busy:
+                self._rerun_pending = True
+        else:
+            task = self._detection_task = self.hass.async_create_task(
+                self._async_detection_worker(),
+                f"{DOMAIN} detection {self._camera_entity}",
+            )
+        # Shield so a cancelled caller does not cancel the shared run
+        return await asyncio.shield(task)
 
-        return self.data
+    async def _async_detection_worker(self):
+        """Run detections until no follow-up run has been requested."""
+        while True:
+            self._rerun_pending = False
+            previous_confidence = _peak_confidence(self.data.get(ATTR_RAW_DETECTIONS))
+            async with self._detection_semaphore:
+                timed_run = LoopTimer(self._async_run_detection())
+                if await timed_run:
+                    self.data[ATTR_LOOP_BLOCKING_MS] = timed_run.ms
+                    # Notify listeners
+                    self.async_set_updated_data(self.data)
+                    self._result_store.async_schedule_save(
+                        self._result_to_save, self._image_to_save
+                    )
+            self._async_adapt_cadence(previous_confidence)
+            if not self._rerun_pending:
+                return self.data
 
-    async def async_trigger_detection(self):
-        """Manually trigger the heavy detection logic."""
-        _LOGGER.debug("Triggering manual Obico detection")
+    @callback
+    def async_enable_auto_detection(self) -> None:
+        """Set up the built-in detection loop (no-op unless enabled).
 
-        camera_state = self.hass.states.get(self._camera_entity)
-        if camera_state is None:
-            _LOGGER.warning(f"Source camera entity {self._camera_entity} not found")
+        Without a printer entity the loop runs permanently. With one, it only
+        runs while the printer is in one of the active states and is started
+        and stopped from state change events.
+        """
+        if not self._auto_detect:
+            return
+        if self._printer_entity is None:
+            self.async_start_auto_detection()
+            return
+        self._unsub_printer_state = async_track_state_change_event(
+            self.hass, [self._printer_entity], self._async_printer_state_changed
+        )
+        self._async_update_printer_activity(self.hass.states.get(self._printer_entity))
+
+    @callback
+    def _async_printer_state_changed(self, event: Event) -> None:
+        self._async_update_printer_activity(event.data.get("new_state"))
+
+    @callback
+    def _async_update_printer_activity(self, state: State | None) -> None:
+        """Start or stop the loop to follow the printer's state."""
+        active = state is not None and state.state.lower() in self._active_states
+        if active and not self._auto_detect_active:
+            _LOGGER.debug(
+                f"{self._printer_entity} is {state.state}, starting detection"
+            )
+            self.async_start_auto_detection()
+        elif not active and self._auto_detect_active:
+            _LOGGER.debug(f"{self._printer_entity} is inactive, stopping detection")
+            self.async_stop_auto_detection()
+
+    @callback
+    def async_enable_frame_trigger(self) -> None:
+        """Run a detection whenever the source entity publishes a new frame."""
+        if not self._detect_on_new_frame:
             return
+        self._unsub_camera_state = async_track_state_change_event(
+            self.hass, [self._camera_entity], self._async_camera_state_changed
+        )
+
+    @callback
+    def _async_camera_state_changed(self, event: Event) -> None:
+        """Trigger on a new frame: a new state (image entities) or picture token."""
+        old_state: State | None = event.data.get("old_state")
+        new_state: State | None = event.data.get("new_state")
+        if new_state is None or new_state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            return
+        if (
+            old_state is not None
+            and old_state.state == new_state.state
+            and old_state.attributes.get("entity_picture")
+            == new_state.attributes.get("entity_picture")
+        ):
+            return
+        if self._printer_entity is not None:
+            printer = self.hass.states.get(self._printer_entity)
+            if printer is None or printer.state.lower() not in self._active_states:
+                return
 
-        camera_image_url = camera_state.attributes.get("entity_picture")
-        if not camera_image_url:
+        if self._detection_task is not None and not self._detection_task.done():
+            # The frame is gone by the time the current run finishes
+            self.data[ATTR_FRAMES_DROPPED] += 1
             return
+        wait = self._min_frame_gap - (time.monotonic() - self._last_frame_trigger)
+        if wait > 0:
+            # Too soon: run once at the end of the gap on the newest frame
+            if self._unsub_frame_gap_timer is None:
+                self._unsub_frame_gap_timer = async_call_later(
+                    self.hass, wait, self._async_frame_gap_elapsed
+                )
+            else:
+                self.data[ATTR_FRAMES_DROPPED] += 1
+            return
+        self._async_run_frame_triggered()
 
-        if camera_image_url.startswith("/"):
-            camera_image_url = f"{get_url(self.hass)}{camera_image_url}"
+    @callback
+    def _async_frame_gap_elapsed(self, _now) -> None:
+        self._unsub_frame_gap_timer = None
+        if self._detection_task is not None and not self._detection_task.done():
+            self.data[ATTR_FRAMES_DROPPED] += 1
+            return
+        self._async_run_frame_triggered()
+
+    @callback
+    def _async_run_frame_triggered(self) -> None:
+        self._last_frame_trigger = time.monotonic()
+        self.hass.async_create_task(self.async_trigger_detection())
+
+    @callback
+    def async_start_auto_detection(self) -> None:
+        """Start the built-in detection loop."""
+        if not self._auto_detect or self._auto_detect_active:
+            return
+        self._auto_detect_active = True
+        self._detection_interval = float(self._min_interval)
+        self.data[ATTR_DETECTION_INTERVAL] = self._detection_interval
+        self._async_schedule_detection()
+        self.async_update_listeners()
+
+    @callback
+    def async_stop_auto_detection(self) -> None:
+        """Stop the built-in detection loop."""
+        self._auto_detect_active = False
+        self.data[ATTR_DETECTION_INTERVAL] = None
+        self._async_schedule_detection()
+        self.async_update_listeners()
+
+    @callback
+    def _async_schedule_detection(self) -> None:
+        """(Re)arm the timer for the next automatic detection.
+
+        Runs are aligned to this entry's own phase within the interval, so
+        entries on the same cadence spread their requests over the interval
+        instead of all firing in the same second.
+        """
+        if self._unsub_detection_timer is not None:
+            self._unsub_detection_timer()
+            self._unsub_detection_timer = None
+        if self._auto_detect_active:
+            interval = self._detection_interval
+            offset = self._phase * interval
+            delay = interval - ((time.time() - offset) % interval)
+            self._unsub_detection_timer = async_call_later(
+                self.hass, delay, self._async_scheduled_detection
+            )
 
-        session = async_get_clientsession(self.hass)
+    async def _async_scheduled_detection(self, _now) -> None:
+        self._unsub_detection_timer = None
+        await self.async_trigger_detection()
+
+    @callback
+    def _async_adapt_cadence(self, previous_confidence: float) -> None:
+        """Pick the next interval from the latest result and re-arm the timer.
+
+        A detection drops straight to the minimum interval, a rising
+        confidence below the threshold divides the interval by the ramp
+        factor, and any other clean result multiplies it, within the
+        configured bounds. Only raw detections (threshold applied locally)
+        carry sub-threshold confidences; without them a clean result always
+        slows down.
+        """
+        if not self._auto_detect_active:
+            return
+        confidence = _peak_confidence(self.data.get(ATTR_RAW_DETECTIONS))
+        if self.data.get(ATTR_ERROR_DETECTED):
+            interval = self._min_interval
+        elif confidence > previous_confidence:
+            interval = self._detection_interval / self._interval_factor
+        else:
+            interval = self._detection_interval * self._interval_factor
+        self._detection_interval = float(
+            min(max(interval, self._min_interval), self._max_interval)
+        )
+        self.data[ATTR_DETECTION_INTERVAL] = round(self._detection_interval, 1)
+        _LOGGER.debug(f"Next automatic detection in {self._detection_interval:.1f}s")
+        self._async_schedule_detection()
+
+    async def async_shutdown(self) -> None:
+        """Stop the detection loop and cancel any in-flight detection."""
+        await super().async_shutdown()
+        if self._unsub_printer_state is not None:
+            self._unsub_printer_state()
+            self._unsub_printer_state = None
+        if self._unsub_camera_state is not None:
+            self._unsub_camera_state()
+            self._unsub_camera_state = None
+        if self._unsub_frame_gap_timer is not None:
+            self._unsub_frame_gap_timer()
+            self._unsub_frame_gap_timer = None
+        self.async_stop_auto_detection()
+        if self._detection_task is not None and not self._detection_task.done():
+            self._detection_task.cancel()
+        self._detection_task = None
+        await self._result_store.async_flush()
+        self.image_store.async_remove(self._image_key)
+        await self._client.async_close()
+
+    async def async_restore(self) -> None:
+        """Load the last persisted result so entities start populated."""
+        saved = await self._result_store.async_load()
+        if not saved:
+            return
+        self.restored_from_store = True
+        for key in PERSISTED_KEYS:
+            if key in saved.get("data", {}):
+                self.data[key] = saved["data"][key]
+        for row in saved.get("history", []):
+            self.history.record(
+                row["timestamp"], row["confidence"], row["boxes"], row["inference_ms"]
+            )
+        self._render_locally = saved.get("render_locally", False)
+        self._restored_image = saved.get("image")
+        # Re-filter at the current threshold, which may have just changed
+        if self._local_threshold and self.data.get(ATTR_RAW_DETECTIONS) is not None:
+            self._apply_threshold()
+        _LOGGER.debug(
+            f"Restored last Obico result from {self.data.get(ATTR_LAST_DETECTION)}"
+        )
+
+    def _result_to_save(self) -> dict:
+        stored = self.image_store.peek(self._image_key)
+        if stored is not None:
+            image = {"level": stored.level, "size": stored.size}
+        else:
+            # A restored image not loaded yet is still on disk, keep pointing at it
+            image = self._restored_image
+        return {
+            "data": {key: self.data.get(key) for key in PERSISTED_KEYS},
+            "history": self.history.as_list(),
+            "render_locally": self._render_locally,
+            "image": image,
+        }
+
+    def _image_to_save(self) -> bytes | None:
+        stored = self.image_store.peek(self._image_key)
+        return stored.content if stored else None
+
+    async def _async_load_restored_image(self) -> None:
+        restored, self._restored_image = self._restored_image, None
+        content = await self._result_store.async_load_image()
+        if content and self.image_store.peek(self._image_key) is None:
+            size = restored.get("size")
+            await self.image_store.async_put(
+                self._image_key,
+                content,
+                restored.get("level", LEVEL_FULL),
+                tuple(size) if size else None,
+            )
+
+    async def async_background_first_refresh(self) -> None:
+        """Run the first connectivity check after the entities are registered.
+
+        Started in the background by the entry setup, so an ML server that is
+        still booting only delays this entry's connectivity state instead of
+        Home Assistant's startup. The /hc probe also opens the pooled
+        connection.
+        """
+        start = time.perf_counter()
+        await self.async_refresh()
+        self.first_refresh_ms = round((time.perf_counter() - start) * 1000, 2)
+        _LOGGER.debug(
+            f"First Obico health check for {self._camera_entity} took "
+            f"{self.first_refresh_ms} ms (connected: "
+            f"{self.data.get(ATTR_API_CONNECTED)})"
+        )
+
+    async def async_detect_frame(
+        self, content: bytes, threshold: float
+    ) -> DetectionResult:
+        """Run a frame through this entry's preprocessing and ML server(s).
+
+        Used for offline analysis: nothing is published or stored, and the
+        boxes are mapped back to the frame's own geometry.
+        """
+        prepared = PreparedFrame(content)
+        if self._roi or self._resize_long_edge or self._jpeg_quality:
+            prepared = await self.hass.async_add_executor_job(
+                prepare_frame,
+                content,
+                self._roi,
+                self._resize_long_edge,
+                self._jpeg_quality,
+            )
+        result = await self._client.async_detect(prepared.content, threshold, False)
+        result.detections = prepared.map_detections(result.detections)
+        return result
+
+    async def _async_run_detection(self) -> bool:
+        """Fetch a frame, send it to the ML server and update self.data.
+
+        Returns True if self.data changed and should be published.
+        """
+        _LOGGER.debug("Triggering manual Obico detection")
+        stages = self.stage_stats
+        # Started before any early return, so no run reports the last one's timings
+        stages.new_run()
+
+        if self.hass.states.get(self._camera_entity) is None:
+            _LOGGER.warning(f"Source camera entity {self._camera_entity} not found")
+            return False
+
+        # Fail fast while the server is known to be down
+        if self._client.state == BREAKER_OPEN:
+            _LOGGER.debug(
+                f"Obico API marked down, skipping detection "
+                f"(retry in {self._client.retry_in:.0f}s)"
+            )
+            self.data[ATTR_API_CONNECTED] = False
+            self.data[ATTR_CIRCUIT_STATE] = BREAKER_OPEN
+            return True
 
         try:
-            # 1. Fetch Image
-            async with async_timeout.timeout(10):
-                async with session.get(camera_image_url) as response:
-                    if response.status != 200:
-                        _LOGGER.error(f"Error fetching camera image: {response.status}")
-                        return
-                    original_image_data = await response.read()
-
-            original_image_base64 = base64.b64encode(original_image_data).decode(
-                "utf-8"
+            start = time.perf_counter()
+
+            # 1. Fetch Image (in-process, HTTP loopback only as a fallback),
+            # shared with other entries watching the same camera
+            frame = await self.frame_cache.async_get(self._camera_entity)
+            if frame is None:
+                return False
+            original_image_data = frame.content
+            self.data[ATTR_FRAME_FETCH_MS] = frame.fetch_ms
+            self.data[ATTR_FRAME_SOURCE] = frame.source
+            stages.record(STAGE_FETCH, frame.fetch_ms)
+            self.payload_stats.record(PAYLOAD_FRAME, len(original_image_data))
+
+            # 2. Skip inference if the frame has not meaningfully changed
+            signature = None
+            if self._change_threshold:
+                with stages.time(STAGE_FINGERPRINT):
+                    signature = await self._async_frame_signature(original_image_data)
+                if self._frame_unchanged(signature):
+                    self.data[ATTR_INFERENCES_SKIPPED] += 1
+                    return True
+
+            # 3. Crop/resize/re-encode off the event loop
+            prepared = PreparedFrame(original_image_data)
+            if self._roi or self._resize_long_edge or self._jpeg_quality:
+                with stages.time(STAGE_PREPROCESS):
+                    prepared = await self.hass.async_add_executor_job(
+                        prepare_frame,
+                        original_image_data,
+                        self._roi,
+                        self._resize_long_edge,
+                        self._jpeg_quality,
+                    )
+            # A server-side annotation would not match the original frame
+            return_annotated = not (
+                prepared.transformed or self._local_annotation or self._local_threshold
             )
 
-            # 2. JSON Payload
-            payload_dict = {
-                "img": original_image_base64,
-                "threshold": self._threshold,
-                "return_annotated": True,
-                "nms": 0.45,
-            }
-
-            # 3. Send to Obico ML Server
-            async with async_timeout.timeout(20):
-                async with session.post(
-                    self._url, json=payload_dict
-                ) as detection_response:
-                    if detection_response.status != 200:
-                        text = await detection_response.text()
-                        _LOGGER.error(
-                            f"Obico API failed {detection_response.status}: {text}"
-                        )
-                        self.data[ATTR_API_CONNECTED] = (
-                            False  # Assume connection issue if it fails?
-                        )
-                        # Or maybe just API error. Let's keep connected=True if we got a response.
-                        self.async_set_updated_data(self.data)
-                        return
-                    detection_data = await detection_response.json()
-
-            # 4. Process Response
+            # 4. Send to Obico ML Server
+            try:
+                result = await self._client.async_detect(
+                    prepared.content, self.request_threshold, return_annotated
+                )
+            except ObicoUnavailableError as err:
+                _LOGGER.debug(str(err))
+                self.data[ATTR_API_CONNECTED] = False
+                self.data[ATTR_CIRCUIT_STATE] = self._client.state
+                return True
+            except ObicoApiError as err:
+                _LOGGER.error(str(err))
+                self.data[ATTR_API_CONNECTED] = False
+                self.data[ATTR_CIRCUIT_STATE] = self._client.state
+                return True
+
+            # 5. Process Response
             self.data[ATTR_API_CONNECTED] = True
+            self.data[ATTR_CIRCUIT_STATE] = self._client.state
+            self.data[ATTR_INFERENCES_RUN] += 1
+            self._last_signature = signature
+            self.data[ATTR_TRANSPORT] = self._client.active_transport
+            self._record_result_stats(result)
 
-            detections = detection_data.get("detections", [])
+            detections = prepared.map_detections(result.detections)
+            if self._local_threshold:
+                self.data[ATTR_RAW_DETECTIONS] = detections
+                detections = self._above_threshold(detections)
+            else:
+                self.data[ATTR_RAW_DETECTIONS] = None
+            self.data[ATTR_DETECTIONS] = detections
             self.data[ATTR_ERROR_DETECTED] = len(detections) > 0
-            self.data[ATTR_INFERENCE_MS] = detection_data.get("inference_ms", 0)
-            self.data[ATTR_PROVIDER] = detection_data.get("provider", "unknown")
+            self.data[ATTR_INFERENCE_MS] = result.inference_ms
+            self.data[ATTR_PROVIDER] = result.provider
             self.data[ATTR_LAST_DETECTION] = datetime.now().isoformat()
 
-            avg_confidence = 0
-            if detections:
-                confidences = [d[1] for d in detections]
-                avg_confidence = (sum(confidences) / len(confidences)) * 100
-                avg_confidence = round(avg_confidence, 2)
+            avg_confidence = _average_confidence(detections)
             self.data[ATTR_AVG_CONFIDENCE] = avg_confidence
+            self.history.record(
+                time.time(),
+                avg_confidence,
+                len(detections),
+                _as_ms(result.inference_ms),
+            )
 
-            image_with_errors_base64 = detection_data.get("image_with_detections")
-            if image_with_errors_base64:
-                self.data[ATTR_IMAGE_WITH_ERRORS] = base64.b64decode(
-                    image_with_errors_base64
-                )
-            else:
-                self.data[ATTR_IMAGE_WITH_ERRORS] = original_image_data
+            # Without a server annotation the boxes are drawn on demand
+            await self.image_store.async_put(
+                self._image_key, result.annotated_image or original_image_data
+            )
+            self._render_locally = not result.annotated_image and bool(detections)
 
-            # Notify listeners
-            self.async_set_updated_data(self.data)
+            stages.record(STAGE_TOTAL, (time.perf_counter() - start) * 1000)
+            return True
 
         except Exception as err:
             _LOGGER.error(f"Error executing Obico detection: {err}")
             self.data[ATTR_API_CONNECTED] = False
-            self.async_set_updated_data(self.data)
+            self.data[ATTR_CIRCUIT_STATE] = self._client.state
+            return True
+
+    async def async_get_image(
+        self, width: int | None = None, height: int | None = None
+    ) -> bytes | None:
+        """Return the latest analyzed image, fitted into ``width`` x ``height``.
+
+        Locally annotated images are only drawn when requested; renders are
+        kept per size in the image store until the image changes.
+        """
+        if self._restored_image is not None:
+            await self._async_load_restored_image()
+        stored = self.image_store.get(self._image_key)
+        if stored is None:
+            return None
+        if not (self._render_locally or width or height):
+            return stored.content
+
+        size = (width, height)
+        if rendered := self.image_store.get_render(self._image_key, stored, size):
+            return rendered
+
+        detections = self.data[ATTR_DETECTIONS] if self._render_locally else None
+        try:
+            # Renders follow camera views, not detection runs
+            with self.stage_stats.time(STAGE_RENDER, in_run=False):
+                rendered = await self.hass.async_add_executor_job(
+                    render_frame,
+                    stored.content,
+                    detections,
+                    width,
+                    height,
+                    stored.size,
+                )
+        except Exception as err:
+            _LOGGER.warning(f"Unable to render the analyzed image: {err}")
+            return stored.content
+
+        await self.image_store.async_put_render(self._image_key, stored, size, rendered)
+        return rendered
+
+    def result_summary(self) -> dict:
+        """Return the last result as reported by the trigger_detection service."""
+        return {
+            "camera_entity": self._camera_entity,
+            "api_connected": self.data.get(ATTR_API_CONNECTED),
+            "detected": self.data.get(ATTR_ERROR_DETECTED),
+            "confidence": self.data.get(ATTR_AVG_CONFIDENCE),
+            "detections": self.data.get(ATTR_DETECTIONS),
+            "inference_ms": self.data.get(ATTR_INFERENCE_MS),
+            "last_detection": self.data.get(ATTR_LAST_DETECTION),
+            "timings_ms": dict(self.stage_stats.run),
+        }
+
+    def _record_result_stats(self, result: DetectionResult) -> None:
+        """Feed the client-side stage times and payload sizes into the stats."""
+        for stage, duration in result.timings.items():
+            self.stage_stats.record(stage, duration)
+        server_ms = _as_ms(result.inference_ms)
+        if server_ms:
+            self.stage_stats.record(STAGE_SERVER, server_ms)
+            # Upload, server-side queueing and download
+            request_ms = result.timings.get(STAGE_REQUEST)
+            if request_ms is not None:
+                self.stage_stats.record(STAGE_NETWORK, max(request_ms - server_ms, 0))
+        self.payload_stats.record(PAYLOAD_UPLOAD, result.upload_bytes)
+        self.payload_stats.record(PAYLOAD_RESPONSE, result.response_bytes)
+
+    async def _async_frame_signature(self, content: bytes) -> FrameSignature | None:
+        """Fingerprint a frame in the executor; None if it cannot be decoded."""
+        try:
+            return await self.hass.async_add_executor_job(frame_signature, content)
+        except Exception as err:
+            _LOGGER.debug(f"Unable to fingerprint frame, not gating it: {err}")
+            return None
+
+    def _frame_unchanged(self, signature: FrameSignature | None) -> bool:
+        """Return True if the frame is within the change threshold."""
+        if signature is None or self._last_signature is None:
+            return False
+        difference = signature.difference(self._last_signature)
+        if difference > self._change_threshold:
+            return False
+        _LOGGER.debug(
+            f"Frame differs {difference:.2f}% from the last analyzed frame, "
+            "reusing previous result"
+        )
+        return True
 
 
 class ObicoEntity(CoordinatorEntity):
@@ -195,3 +847,24 @@ class ObicoEntity(CoordinatorEntity):
             model="ML API Integration",
             configuration_url=entry.data.get("url"),
         )
+        self._last_written: tuple | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if this entity's state or attributes changed.
+
+        Every detection notifies all entities of the entry; most of them
+        (connectivity, counters, rolling statistics) often render the same
+        state and attributes, and rewriting those only adds recorder and
+        websocket traffic.
+        """
+        written = (
+            self.available,
+            self.state,
+            self.state_attributes,
+            self.extra_state_attributes,
+        )
+        if written == self._last_written:
+            return
+        self._last_written = written
+        self.async_write_ha_state()
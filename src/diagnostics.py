@@ -0,0 +1,64 @@
+"""Diagnostics support for Obico ML."""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_URL
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_EXTRA_URLS, DOMAIN
+
+TO_REDACT = {CONF_URL, CONF_EXTRA_URLS}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return per-stage timings, payload sizes and state for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    client = coordinator.client
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "state": {
+            key: value
+            for key, value in coordinator.data.items()
+            if not isinstance(value, bytes)
+        },
+        "client": {
+            "transport": client.transport,
+            "active_transport": client.active_transport,
+            "circuit_state": client.state,
+            "endpoints": [
+                {
+                    "circuit_state": endpoint.breaker.state,
+                    "consecutive_failures": endpoint.breaker.failures,
+                    "retry_in": round(endpoint.breaker.retry_in, 1),
+                    "latency_ewma_ms": endpoint.server.latency_ms,
+                    "in_flight": endpoint.server.in_flight,
+                    "server_users": endpoint.server.users,
+                }
+                for endpoint in client.clients
+            ],
+        },
+        "startup_ms": {
+            "setup": coordinator.setup_ms,
+            "first_refresh": coordinator.first_refresh_ms,
+        },
+        "stages_ms": coordinator.stage_stats.as_dict(),
+        "payload_bytes": coordinator.payload_stats.as_dict(),
+        "history": coordinator.history.as_list(),
+        "frame_cache": coordinator.frame_cache.as_dict(),
+        "image_store": {
+            "usage": coordinator.image_store.usage,
+            "peak": coordinator.image_store.peak,
+            "budget": coordinator.image_store.budget,
+            "entry_usage": coordinator.image_store.usage_of(entry.entry_id),
+            "entry_level": getattr(
+                coordinator.image_store.peek(entry.entry_id), "level", None
+            ),
+        },
+    }
@@ -0,0 +1,112 @@
+"""Frame acquisition for Obico ML detection.
+
+Frames are read straight from the camera/image entity inside Home Assistant.
+Looping back over HTTP through the HA frontend is only used as a fallback.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+
+import async_timeout
+from homeassistant.components import camera
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.network import get_url
+
+_LOGGER = logging.getLogger(__name__)
+
+FRAME_TIMEOUT = 10
+
+SOURCE_CAMERA = "camera"
+SOURCE_IMAGE = "image"
+SOURCE_HTTP = "http"
+
+
+@dataclass
+class Frame:
+    """A single frame grabbed from the source entity."""
+
+    content: bytes
+    content_type: str
+    source: str
+    fetch_ms: float
+
+
+async def _async_get_camera_image(hass: HomeAssistant, entity_id: str):
+    """Read a frame through the camera component's image API."""
+    image = await camera.async_get_image(hass, entity_id, timeout=FRAME_TIMEOUT)
+    return image.content, image.content_type
+
+
+async def _async_get_image_entity_image(hass: HomeAssistant, entity_id: str):
+    """Read a frame directly from an image entity."""
+    component = hass.data.get("image")
+    entity = component.get_entity(entity_id) if component else None
+    if entity is None:
+        raise HomeAssistantError(f"Image entity {entity_id} not found")
+
+    async with async_timeout.timeout(FRAME_TIMEOUT):
+        content = await entity.async_image()
+    if not content:
+        raise HomeAssistantError(f"Image entity {entity_id} returned no data")
+    return content, entity.content_type
+
+
+async def _async_get_http_image(hass: HomeAssistant, entity_id: str):
+    """Download a frame from the entity_picture URL (fallback path)."""
+    state = hass.states.get(entity_id)
+    image_url = state.attributes.get("entity_picture") if state else None
+    if not image_url:
+        raise HomeAssistantError(f"{entity_id} has no entity_picture")
+
+    if image_url.startswith("/"):
+        image_url = f"{get_url(hass)}{image_url}"
+
+    session = async_get_clientsession(hass)
+    async with async_timeout.timeout(FRAME_TIMEOUT):
+        async with session.get(image_url) as response:
+            if response.status != 200:
+                raise HomeAssistantError(
+                    f"Error fetching camera image: {response.status}"
+                )
+            return await response.read(), response.content_type
+
+
+async def async_get_frame(hass: HomeAssistant, entity_id: str) -> Frame | None:
+    """Fetch the current frame of a camera or image entity.
+
+    The in-process path is tried first; the HTTP loopback is only used when
+    it fails. Returns None if no frame could be acquired.
+    """
+    domain = entity_id.split(".", 1)[0]
+    fetchers = []
+    if domain == SOURCE_CAMERA:
+        fetchers.append((SOURCE_CAMERA, _async_get_camera_image))
+    elif domain == SOURCE_IMAGE:
+        fetchers.append((SOURCE_IMAGE, _async_get_image_entity_image))
+    fetchers.append((SOURCE_HTTP, _async_get_http_image))
+
+    for source, fetcher in fetchers:
+        start = time.perf_counter()
+        try:
+            content, content_type = await fetcher(hass, entity_id)
+        except Exception as err:
+            _LOGGER.debug(
+                "Frame fetch via %s failed for %s: %s", source, entity_id, err
+            )
+            continue
+
+        fetch_ms = round((time.perf_counter() - start) * 1000, 2)
+        _LOGGER.debug(
+            "Fetched %s bytes from %s via %s in %s ms",
+            len(content),
+            entity_id,
+            source,
+            fetch_ms,
+        )
+        return Frame(content, content_type, source, fetch_ms)
+
+    _LOGGER.error(f"Unable to fetch a frame from {entity_id}")
+    return None
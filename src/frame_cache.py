@@ -0,0 +1,172 @@
+"""Integration-wide cache of camera frames shared by Obico ML entries."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field, replace
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .api import _b64encode, async_run_cpu
+from .frame import Frame, async_get_frame
+
+ENCODED_FRAMES = 4
+
+
+@dataclass
+class _CachedFrame:
+    marker: tuple
+    task: asyncio.Task
+    fetched_at: float | None = None
+    unsub_expire: object = field(default=None, repr=False)
+
+
+def _frame_marker(hass: HomeAssistant, entity_id: str) -> tuple:
+    """Identify the frame an entity currently publishes.
+
+    Image entities change state and camera entities rotate their picture
+    token on a new frame, so a cached frame is never served past either.
+    """
+    state = hass.states.get(entity_id)
+    if state is None:
+        return (None, None)
+    return (state.state, state.attributes.get("entity_picture"))
+
+
+class ObicoFrameCache:
+    """Share frame fetches between entries watching the same camera.
+
+    The same camera can be configured against several ML servers (e.g. to
+    compare two models). Entries that ask for a frame while a fetch for that
+    camera is in flight, or up to ``ttl`` seconds after it completed, get
+    the same ``Frame`` instead of fetching again. Base64 encodings of
+    uploaded frames are shared the same way, so a frame sent to N servers is
+    also encoded once; an encoding and its frame are released ``ttl``
+    seconds after the encode finished. A ``ttl`` of 0 only deduplicates
+    fetches and encodes that overlap.
+    """
+
+    def __init__(self, hass: HomeAssistant, ttl: float = 0):
+        self.hass = hass
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.encode_hits = 0
+        self.encode_misses = 0
+        self._frames: dict[str, _CachedFrame] = {}
+        # id(image) -> (image, encode task); the image pins its id
+        self._encoded: dict[int, tuple[bytes, asyncio.Task]] = {}
+
+    @property
+    def hit_rate(self) -> float | None:
+        """Percentage of frame requests served without a new fetch."""
+        total = self.hits + self.misses
+        if not total:
+            return None
+        return round(self.hits * 100 / total, 1)
+
+    async def async_get(self, entity_id: str) -> Frame | None:
+        """Return the current frame of ``entity_id``, fetching it if needed.
+
+        ``fetch_ms`` of the returned frame is the time this caller waited.
+        """
+        start = time.perf_counter()
+        marker = _frame_marker(self.hass, entity_id)
+        cached = self._frames.get(entity_id)
+        if (
+            cached is not None
+            and cached.marker == marker
+            and (
+                cached.fetched_at is None
+                or time.monotonic() - cached.fetched_at < self.ttl
+            )
+        ):
+            self.hits += 1
+            # Shielded so a cancelled caller does not cancel the shared fetch
+            frame = await asyncio.shield(cached.task)
+            if frame is None:
+                return None
+            return replace(
+                frame, fetch_ms=round((time.perf_counter() - start) * 1000, 2)
+            )
+
+        self.misses += 1
+        if cached is not None:
+            self._async_drop(entity_id, cached)
+        task = self.hass.async_create_background_task(
+            async_get_frame(self.hass, entity_id), f"obico_ml frame {entity_id}"
+        )
+        cached = self._frames[entity_id] = _CachedFrame(marker, task)
+        task.add_done_callback(lambda _task: self._async_fetched(entity_id, cached))
+        return await asyncio.shield(task)
+
+    @callback
+    def _async_fetched(self, entity_id: str, cached: _CachedFrame) -> None:
+        if self._frames.get(entity_id) is not cached:
+            return
+        if cached.task.cancelled() or cached.task.exception() is not None:
+            self._async_drop(entity_id, cached)
+            return
+        if cached.task.result() is None or not self.ttl:
+            self._async_drop(entity_id, cached)
+            return
+        cached.fetched_at = time.monotonic()
+        # Release the frame once it can no longer be served
+        cached.unsub_expire = async_call_later(
+            self.hass, self.ttl, lambda _now: self._async_drop(entity_id, cached)
+        )
+
+    @callback
+    def _async_drop(self, entity_id: str, cached: _CachedFrame) -> None:
+        if cached.unsub_expire is not None:
+            cached.unsub_expire()
+            cached.unsub_expire = None
+        if self._frames.get(entity_id) is cached:
+            del self._frames[entity_id]
+
+    async def async_encode(self, image: bytes) -> str:
+        """Base64-encode ``image``, reusing the encoding of a shared frame."""
+        key = id(image)
+        encoded = self._encoded.get(key)
+        if encoded is not None and encoded[0] is image:
+            self.encode_hits += 1
+            return await asyncio.shield(encoded[1])
+
+        self.encode_misses += 1
+        task = self.hass.async_create_background_task(
+            async_run_cpu(self.hass, len(image), _b64encode, image),
+            "obico_ml frame encode",
+        )
+        self._encoded[key] = (image, task)
+        if len(self._encoded) > ENCODED_FRAMES:
+            del self._encoded[next(iter(self._encoded))]
+        task.add_done_callback(lambda _task: self._async_encoded(key, task))
+        return await asyncio.shield(task)
+
+    @callback
+    def _async_encoded(self, key: int, task: asyncio.Task) -> None:
+        # Release the frame and its encoding once they can no longer be shared
+        if not self.ttl:
+            self._async_drop_encoded(key, task)
+            return
+        async_call_later(
+            self.hass, self.ttl, lambda _now: self._async_drop_encoded(key, task)
+        )
+
+    @callback
+    def _async_drop_encoded(self, key: int, task: asyncio.Task) -> None:
+        encoded = self._encoded.get(key)
+        if encoded is not None and encoded[1] is task:
+            del self._encoded[key]
+
+    def as_dict(self) -> dict:
+        return {
+            "ttl": self.ttl,
+            "cached_cameras": len(self._frames),
+            "encoded_frames": len(self._encoded),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "encode_hits": self.encode_hits,
+            "encode_misses": self.encode_misses,
+        }
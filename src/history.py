@@ -0,0 +1,117 @@
+"""Bounded rolling history of detection results for Obico ML."""
+
+import math
+from array import array
+from bisect import bisect_left, insort
+from collections import deque
+
+HISTORY_SIZE = 100
+MAX_BOX_COUNT = 0xFFFF
+
+
+class DetectionHistory:
+    """Fixed-size ring buffer of the last ``size`` inference runs.
+
+    Every column is a preallocated ``array`` so memory stays constant however
+    long a print runs. The rolling aggregates are maintained incrementally as
+    runs enter and leave the window instead of rescanning it:
+
+    * failure count and confidence sum are adjusted by the entering and the
+      evicted run,
+    * the maximum confidence uses a monotonic queue of window positions,
+    * inference times are mirrored in a sorted array, so percentiles are a
+      single index lookup.
+    """
+
+    def __init__(self, size: int = HISTORY_SIZE):
+        self.size = size
+        self.count = 0
+        self._next = 0
+        self._seq = 0
+        self._timestamps = array("d", [0.0]) * size
+        self._confidences = array("d", [0.0]) * size
+        self._boxes = array("H", [0]) * size
+        self._inference_ms = array("d", [0.0]) * size
+
+        self._failures = 0
+        self._confidence_sum = 0.0
+        self._max_confidence: deque[tuple[int, float]] = deque()
+        self._sorted_inference_ms = array("d")
+
+    def record(
+        self, timestamp: float, confidence: float, boxes: int, inference_ms: float
+    ) -> None:
+        """Append a run, evicting the oldest one once the buffer is full."""
+        index = self._next
+        if self.count == self.size:
+            self._evict(index)
+        else:
+            self.count += 1
+
+        boxes = min(boxes, MAX_BOX_COUNT)
+        self._timestamps[index] = timestamp
+        self._confidences[index] = confidence
+        self._boxes[index] = boxes
+        self._inference_ms[index] = inference_ms
+        self._next = (index + 1) % self.size
+
+        if boxes:
+            self._failures += 1
+        self._confidence_sum += confidence
+        insort(self._sorted_inference_ms, inference_ms)
+
+        while self._max_confidence and self._max_confidence[-1][1] <= confidence:
+            self._max_confidence.pop()
+        self._max_confidence.append((self._seq, confidence))
+        self._seq += 1
+        while self._max_confidence[0][0] < self._seq - self.count:
+            self._max_confidence.popleft()
+
+    def _evict(self, index: int) -> None:
+        if self._boxes[index]:
+            self._failures -= 1
+        self._confidence_sum -= self._confidences[index]
+        sorted_ms = self._sorted_inference_ms
+        del sorted_ms[bisect_left(sorted_ms, self._inference_ms[index])]
+
+    @property
+    def failure_rate(self) -> float | None:
+        """Percentage of runs in the window that detected a failure."""
+        if not self.count:
+            return None
+        return round(self._failures * 100 / self.count, 1)
+
+    @property
+    def mean_confidence(self) -> float | None:
+        if not self.count:
+            return None
+        return round(max(self._confidence_sum, 0) / self.count, 2)
+
+    @property
+    def max_confidence(self) -> float | None:
+        if not self.count:
+            return None
+        return round(self._max_confidence[0][1], 2)
+
+    def inference_percentile(self, percentile: float) -> float | None:
+        """Nearest-rank percentile of the inference times in the window."""
+        if not self.count:
+            return None
+        index = max(math.ceil(percentile / 100 * self.count) - 1, 0)
+        return round(self._sorted_inference_ms[index], 2)
+
+    def as_list(self) -> list[dict]:
+        """Return the runs in the window, oldest first."""
+        start = (self._next - self.count) % self.size
+        rows = []
+        for offset in range(self.count):
+            index = (start + offset) % self.size
+            rows.append(
+                {
+                    "timestamp": self._timestamps[index],
+                    "confidence": self._confidences[index],
+                    "boxes": self._boxes[index],
+                    "inference_ms": self._inference_ms[index],
+                }
+            )
+        return rows
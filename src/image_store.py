@@ -0,0 +1,214 @@
+"""Integration-wide store for the analyzed images of all Obico ML entries."""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .imaging import shrink_image
+
+_LOGGER = logging.getLogger(__name__)
+
+LEVEL_FULL = "full"
+LEVEL_REDUCED = "reduced"
+LEVEL_THUMBNAIL = "thumbnail"
+
+REDUCED_LONG_EDGE = 1280
+REDUCED_QUALITY = 80
+THUMBNAIL_LONG_EDGE = 320
+THUMBNAIL_QUALITY = 70
+RENDERS_PER_IMAGE = 4
+DOWNSCALE_SWEEP_INTERVAL = timedelta(seconds=60)
+
+
+@dataclass(frozen=True)
+class StoredImage:
+    """An analyzed image at some retention level.
+
+    ``size`` is the original frame size once known; detections always refer
+    to it, so reduced copies can still be annotated correctly.
+    """
+
+    content: bytes
+    level: str = LEVEL_FULL
+    size: tuple[int, int] | None = None
+
+
+class ObicoImageStore:
+    """Keep every entry's latest image within a shared byte budget.
+
+    Images are ordered by last use (stored or viewed). Renders of an image
+    (resized or annotated copies served to the camera) count towards the
+    budget and are dropped whenever the image changes. When the total goes
+    over budget, renders are dropped first, then the least recently used
+    full or reduced images are replaced by a small thumbnail, which is kept
+    until the entry stores a new image. With ``downscale_after`` set, full
+    images neither stored nor viewed for that many seconds are swapped for
+    a reduced copy. A budget of 0 disables eviction.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, budget: int = 0, downscale_after: float = 0
+    ):
+        self.hass = hass
+        self.budget = budget
+        self.downscale_after = downscale_after
+        self.usage = 0
+        self.peak = 0
+        self._images: OrderedDict[str, StoredImage] = OrderedDict()
+        self._renders: dict[str, OrderedDict[tuple, bytes]] = {}
+        self._last_viewed: dict[str, float] = {}
+        self._lock = asyncio.Lock()
+        if downscale_after:
+            async_track_time_interval(
+                hass,
+                self._async_downscale_unviewed,
+                DOWNSCALE_SWEEP_INTERVAL,
+                cancel_on_shutdown=True,
+            )
+
+    def get(self, key: str) -> StoredImage | None:
+        """Return the image stored for ``key`` and mark it as viewed."""
+        stored = self._images.get(key)
+        if stored is not None:
+            self._images.move_to_end(key)
+            self._last_viewed[key] = time.monotonic()
+        return stored
+
+    def peek(self, key: str) -> StoredImage | None:
+        """Return the image stored for ``key`` without touching its recency."""
+        return self._images.get(key)
+
+    def usage_of(self, key: str) -> int:
+        stored = self._images.get(key)
+        return (len(stored.content) if stored else 0) + self._render_usage(key)
+
+    def _render_usage(self, key: str) -> int:
+        return sum(len(content) for content in self._renders.get(key, {}).values())
+
+    def counts(self) -> dict[str, int]:
+        counts = {LEVEL_FULL: 0, LEVEL_REDUCED: 0, LEVEL_THUMBNAIL: 0}
+        for stored in self._images.values():
+            counts[stored.level] += 1
+        counts["renders"] = sum(len(renders) for renders in self._renders.values())
+        return counts
+
+    def get_render(self, key: str, stored: StoredImage, size: tuple) -> bytes | None:
+        """Return the render of ``stored`` for ``size`` if it is still kept."""
+        if self._images.get(key) is not stored:
+            return None
+        renders = self._renders.get(key)
+        if not renders or (content := renders.get(size)) is None:
+            return None
+        renders.move_to_end(size)
+        return content
+
+    async def async_put_render(
+        self, key: str, stored: StoredImage, size: tuple, content: bytes
+    ) -> None:
+        """Keep a render of ``stored`` for ``size`` until the image changes."""
+        # The image may have been replaced while rendering
+        if self._images.get(key) is not stored:
+            return
+        renders = self._renders.setdefault(key, OrderedDict())
+        self.usage += len(content) - len(renders.pop(size, b""))
+        renders[size] = content
+        if len(renders) > RENDERS_PER_IMAGE:
+            self.usage -= len(renders.popitem(last=False)[1])
+        self.peak = max(self.peak, self.usage)
+        if self.budget and self.usage > self.budget:
+            await self._async_enforce_budget()
+
+    @callback
+    def async_drop_renders(self, key: str) -> None:
+        self.usage -= self._render_usage(key)
+        self._renders.pop(key, None)
+
+    async def async_put(
+        self,
+        key: str,
+        content: bytes,
+        level: str = LEVEL_FULL,
+        size: tuple[int, int] | None = None,
+    ) -> None:
+        """Store a new image for ``key`` and enforce the budget."""
+        self._replace(key, StoredImage(content, level, size))
+        self._images.move_to_end(key)
+        # A new image counts as seen, so it is not downscaled at the next sweep
+        self._last_viewed[key] = time.monotonic()
+        if self.budget and self.usage > self.budget:
+            await self._async_enforce_budget()
+
+    @callback
+    def async_remove(self, key: str) -> None:
+        self._replace(key, None)
+        self._last_viewed.pop(key, None)
+
+    def _replace(self, key: str, stored: StoredImage | None) -> None:
+        self.async_drop_renders(key)
+        self.usage -= self.usage_of(key)
+        if stored is None:
+            self._images.pop(key, None)
+            return
+        self._images[key] = stored
+        self.usage += len(stored.content)
+        self.peak = max(self.peak, self.usage)
+
+    async def _async_enforce_budget(self) -> None:
+        """Drop renders, then turn least recently used images into thumbnails."""
+        async with self._lock:
+            for key in [key for key in self._images if key in self._renders]:
+                if self.usage <= self.budget:
+                    return
+                self.async_drop_renders(key)
+            for key in list(self._images):
+                if self.usage <= self.budget:
+                    return
+                stored = self._images.get(key)
+                if stored is None or stored.level == LEVEL_THUMBNAIL:
+                    continue
+                await self._async_shrink(
+                    key, stored, LEVEL_THUMBNAIL, THUMBNAIL_LONG_EDGE, THUMBNAIL_QUALITY
+                )
+            if self.usage > self.budget:
+                _LOGGER.debug(
+                    "Image store at %s bytes with only thumbnails left (budget %s)",
+                    self.usage,
+                    self.budget,
+                )
+
+    async def _async_downscale_unviewed(self, now=None) -> None:
+        """Swap full images nobody looked at recently for reduced copies."""
+        cutoff = time.monotonic() - self.downscale_after
+        async with self._lock:
+            for key, stored in list(self._images.items()):
+                if (
+                    stored.level == LEVEL_FULL
+                    and self._last_viewed.get(key, float("-inf")) < cutoff
+                ):
+                    await self._async_shrink(
+                        key, stored, LEVEL_REDUCED, REDUCED_LONG_EDGE, REDUCED_QUALITY
+                    )
+
+    async def _async_shrink(
+        self, key: str, stored: StoredImage, level: str, long_edge: int, quality: int
+    ) -> None:
+        try:
+            content, size = await self.hass.async_add_executor_job(
+                shrink_image, stored.content, long_edge, quality
+            )
+        except Exception as err:
+            _LOGGER.debug("Unable to shrink image for %s, dropping it: %s", key, err)
+            if self._images.get(key) is stored:
+                self.async_remove(key)
+            return
+
+        # A new image may have been stored while shrinking
+        if self._images.get(key) is not stored or len(content) >= len(stored.content):
+            return
+        self._replace(key, StoredImage(content, level, stored.size or size))
@@ -0,0 +1,220 @@
+"""Image helpers for Obico ML.
+
+Everything in here is CPU bound and blocking; call it through
+``hass.async_add_executor_job``.
+"""
+
+import hashlib
+import io
+from dataclasses import dataclass
+
+from PIL import Image, ImageDraw
+
+SIGNATURE_SIZE = 32
+REENCODE_QUALITY = 85
+BOX_COLOR = (255, 0, 0)
+
+
+@dataclass(frozen=True)
+class FrameSignature:
+    """Cheap fingerprint of a frame used to detect unchanged frames."""
+
+    digest: bytes
+    thumbnail: bytes
+
+    def difference(self, other: "FrameSignature") -> float:
+        """Return the mean absolute pixel difference to ``other`` in percent."""
+        if self.digest == other.digest:
+            return 0.0
+        if len(self.thumbnail) != len(other.thumbnail):
+            return 100.0
+        total = sum(abs(a - b) for a, b in zip(self.thumbnail, other.thumbnail))
+        return total * 100 / (255 * len(self.thumbnail))
+
+
+def frame_signature(content: bytes) -> FrameSignature:
+    """Hash the raw bytes and build a tiny grayscale thumbnail of the frame."""
+    digest = hashlib.blake2b(content, digest_size=16).digest()
+    with Image.open(io.BytesIO(content)) as image:
+        # draft() lets the JPEG decoder skip most of the work at low resolution
+        image.draft("L", (SIGNATURE_SIZE * 2, SIGNATURE_SIZE * 2))
+        thumbnail = (
+            image.convert("L")
+            .resize((SIGNATURE_SIZE, SIGNATURE_SIZE), Image.Resampling.BILINEAR)
+            .tobytes()
+        )
+    return FrameSignature(digest, thumbnail)
+
+
+def parse_roi(value: str | None) -> tuple[float, float, float, float] | None:
+    """Parse ``"left,top,right,bottom"`` given as fractions of the frame.
+
+    Returns None for an empty value and raises ValueError if it is malformed.
+    """
+    if not value or not value.strip():
+        return None
+    parts = [float(part) for part in value.split(",")]
+    if len(parts) != 4:
+        raise ValueError("ROI needs four comma separated values")
+    left, top, right, bottom = parts
+    if not (0 <= left < right <= 1 and 0 <= top < bottom <= 1):
+        raise ValueError(
+            "ROI must satisfy 0 <= left < right <= 1, 0 <= top < bottom <= 1"
+        )
+    return left, top, right, bottom
+
+
+@dataclass(frozen=True)
+class PreparedFrame:
+    """A frame as uploaded, plus what is needed to map boxes back."""
+
+    content: bytes
+    offset_x: int = 0
+    offset_y: int = 0
+    scale: float = 1.0
+
+    @property
+    def transformed(self) -> bool:
+        """Return True if the geometry differs from the original frame."""
+        return self.scale != 1.0 or bool(self.offset_x or self.offset_y)
+
+    def map_detections(self, detections: list) -> list:
+        """Map ``[label, confidence, [xc, yc, w, h]]`` boxes to the original frame."""
+        if not self.transformed:
+            return detections
+        mapped = []
+        for label, confidence, (xc, yc, w, h) in detections:
+            mapped.append(
+                [
+                    label,
+                    confidence,
+                    [
+                        xc / self.scale + self.offset_x,
+                        yc / self.scale + self.offset_y,
+                        w / self.scale,
+                        h / self.scale,
+                    ],
+                ]
+            )
+        return mapped
+
+
+def prepare_frame(
+    content: bytes,
+    roi: tuple[float, float, float, float] | None,
+    max_edge: int,
+    quality: int,
+) -> PreparedFrame:
+    """Crop to the ROI, downscale to ``max_edge`` and re-encode as JPEG.
+
+    The original bytes are passed through untouched when nothing applies.
+    """
+    if roi is None and not max_edge and not quality:
+        return PreparedFrame(content)
+
+    with Image.open(io.BytesIO(content)) as image:
+        width, height = image.size
+        left, top, right, bottom = roi or (0, 0, 1, 1)
+        crop_width, crop_height = (right - left) * width, (bottom - top) * height
+
+        scale = 1.0
+        if max_edge and max(crop_width, crop_height) > max_edge:
+            scale = max_edge / max(crop_width, crop_height)
+            # Let the JPEG decoder do most of the downscaling for free
+            image.draft("RGB", (int(width * scale) + 1, int(height * scale) + 1))
+
+        if roi is not None:
+            image = image.crop(
+                (
+                    round(left * image.width),
+                    round(top * image.height),
+                    round(right * image.width),
+                    round(bottom * image.height),
+                )
+            )
+        if scale != 1.0:
+            image = image.resize(
+                (round(crop_width * scale), round(crop_height * scale)),
+                Image.Resampling.BILINEAR,
+            )
+        elif roi is None and not quality:
+            return PreparedFrame(content)
+
+        output = io.BytesIO()
+        image.convert("RGB").save(output, "JPEG", quality=quality or REENCODE_QUALITY)
+    return PreparedFrame(
+        output.getvalue(),
+        offset_x=round(left * width),
+        offset_y=round(top * height),
+        scale=image.width / crop_width,
+    )
+
+
+def fit_size(
+    size: tuple[int, int], width: int | None, height: int | None
+) -> tuple[int, int]:
+    """Scale ``size`` down to fit ``width`` x ``height``, keeping the aspect."""
+    scale = min(
+        width / size[0] if width else 1,
+        height / size[1] if height else 1,
+        1,
+    )
+    return max(round(size[0] * scale), 1), max(round(size[1] * scale), 1)
+
+
+def shrink_image(
+    content: bytes, long_edge: int, quality: int
+) -> tuple[bytes, tuple[int, int]]:
+    """Downscale to ``long_edge`` and re-encode; also return the original size."""
+    with Image.open(io.BytesIO(content)) as source:
+        original_size = source.size
+        target = fit_size(source.size, long_edge, long_edge)
+        source.draft("RGB", target)
+        image = source.convert("RGB")
+    if image.size != target:
+        image = image.resize(target, Image.Resampling.BILINEAR)
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=quality)
+    return output.getvalue(), original_size
+
+
+def render_frame(
+    content: bytes,
+    detections: list | None,
+    width: int | None = None,
+    height: int | None = None,
+    detections_size: tuple[int, int] | None = None,
+) -> bytes:
+    """Draw ``[label, confidence, [xc, yc, w, h]]`` boxes, fitting the result
+    into ``width`` x ``height``.
+
+    The frame is downscaled before drawing, so small thumbnails are cheap.
+    ``detections_size`` is the frame size the boxes refer to when ``content``
+    is a reduced copy. The original bytes are returned when there is nothing
+    to draw or shrink.
+    """
+    with Image.open(io.BytesIO(content)) as source:
+        target = fit_size(source.size, width, height)
+        if not detections and target == source.size:
+            return content
+        scale = target[0] / (detections_size or source.size)[0]
+        if target != source.size:
+            source.draft("RGB", target)
+        image = source.convert("RGB")
+    if image.size != target:
+        image = image.resize(target, Image.Resampling.BILINEAR)
+
+    draw = ImageDraw.Draw(image)
+    line_width = max(2, round(max(image.size) / 400))
+    for label, confidence, (xc, yc, w, h) in detections or ():
+        xc, yc, w, h = xc * scale, yc * scale, w * scale, h * scale
+        box = (xc - w / 2, yc - h / 2, xc + w / 2, yc + h / 2)
+        draw.rectangle(box, outline=BOX_COLOR, width=line_width)
+        draw.text(
+            (box[0] + line_width, box[1] + line_width),
+            f"{label} {confidence:.2f}",
+            fill=BOX_COLOR,
+        )
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=REENCODE_QUALITY)
+    return output.getvalue()
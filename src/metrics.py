@@ -0,0 +1,127 @@
+"""Timing helpers for the Obico ML detection pipeline."""
+
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+
+METRICS_WINDOW = 256
+PERCENTILES = (50, 95, 99)
+
+STAGE_FETCH = "fetch"
+STAGE_FINGERPRINT = "fingerprint"
+STAGE_PREPROCESS = "preprocess"
+STAGE_ENCODE = "encode"
+STAGE_REQUEST = "request"
+STAGE_SERVER = "server"
+STAGE_NETWORK = "network"
+STAGE_DECODE = "decode"
+STAGE_RENDER = "render"
+STAGE_TOTAL = "total"
+
+PAYLOAD_FRAME = "frame"
+PAYLOAD_UPLOAD = "upload"
+PAYLOAD_RESPONSE = "response"
+
+
+class LoopTimer:
+    """Await a coroutine while timing how long it runs on the event loop.
+
+    Each step of the wrapped coroutine (the code between two suspension
+    points) runs synchronously on the loop; their summed wall time is the
+    time the pipeline blocked every other task. Time spent awaiting I/O or
+    executor jobs is not counted.
+    """
+
+    def __init__(self, coro):
+        self._coro = coro
+        self.seconds = 0.0
+
+    @property
+    def ms(self) -> float:
+        return round(self.seconds * 1000, 2)
+
+    def __await__(self):
+        coro = self._coro
+        value = None
+        error = None
+        while True:
+            start = time.perf_counter()
+            try:
+                if error is not None:
+                    yielded = coro.throw(error)
+                else:
+                    yielded = coro.send(value)
+            except StopIteration as stop:
+                self.seconds += time.perf_counter() - start
+                return stop.value
+            except BaseException:
+                self.seconds += time.perf_counter() - start
+                raise
+            self.seconds += time.perf_counter() - start
+
+            try:
+                value = yield yielded
+                error = None
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as err:
+                value = None
+                error = err
+
+
+class RollingStats:
+    """Last ``window`` samples per key, summarised as percentiles on demand.
+
+    Memory is bounded by the window; summaries sort at most ``window``
+    values, so they are cheap enough to compute whenever a sensor or the
+    diagnostics dump asks for them.
+    """
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self._window = window
+        self._samples: dict[str, deque[float]] = {}
+        self.last: dict[str, float] = {}
+        # Detection samples recorded since the last ``new_run()``
+        self.run: dict[str, float] = {}
+
+    def new_run(self) -> None:
+        self.run = {}
+
+    def record(self, key: str, value: float, in_run: bool = True) -> None:
+        """Add a sample; ``in_run=False`` keeps it out of the current run."""
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self._window)
+        value = round(value, 2)
+        samples.append(value)
+        self.last[key] = value
+        if in_run:
+            self.run[key] = value
+
+    @contextmanager
+    def time(self, key: str, in_run: bool = True):
+        """Record the wall time of the ``with`` block in milliseconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(key, (time.perf_counter() - start) * 1000, in_run)
+
+    def summary(self, key: str) -> dict | None:
+        """Return count, last, max and p50/p95/p99 for ``key``."""
+        samples = self._samples.get(key)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        summary = {"count": len(ordered), "last": self.last[key]}
+        for percentile in PERCENTILES:
+            # Nearest-rank percentile
+            index = max(math.ceil(percentile / 100 * len(ordered)) - 1, 0)
+            summary[f"p{percentile}"] = ordered[index]
+        summary["max"] = ordered[-1]
+        return summary
+
+    def as_dict(self) -> dict[str, dict]:
+        return {key: self.summary(key) for key in self._samples}
@@ -0,0 +1,104 @@
+"""On-disk persistence of each entry's last detection result."""
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+
+def _write_bytes_atomic(path: Path, content: bytes) -> None:
+    temp_path = path.with_suffix(path.suffix + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path.write_bytes(content)
+        os.replace(temp_path, path)
+    except OSError as err:
+        _LOGGER.warning("Unable to save the last Obico image to %s: %s", path, err)
+
+
+class ObicoResultStore:
+    """Persist the last result of an entry across restarts.
+
+    The JSON part (detections, timestamps, counters, history) goes through a
+    Home Assistant ``Store`` with a debounced save, so bursts of detections
+    cause one write and pending data is flushed on shutdown. The annotated
+    JPEG is written next to it as a plain file, only when it changed.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self.hass = hass
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self._image_path = Path(
+            hass.config.path(STORAGE_DIR, f"{DOMAIN}.{entry_id}.jpg")
+        )
+        self._data_func: Callable[[], dict] | None = None
+        self._image_func: Callable[[], bytes | None] | None = None
+        self._saved_image: bytes | None = None
+        self._save_pending = False
+        self._image_write: asyncio.Future | None = None
+
+    async def async_load(self) -> dict[str, Any] | None:
+        """Return the last saved result, or None if there is none."""
+        try:
+            return await self._store.async_load()
+        except Exception as err:
+            _LOGGER.warning("Unable to restore the last Obico result: %s", err)
+            return None
+
+    async def async_load_image(self) -> bytes | None:
+        """Read the last saved image from disk."""
+        try:
+            return await self.hass.async_add_executor_job(self._image_path.read_bytes)
+        except OSError as err:
+            _LOGGER.debug("No saved Obico image at %s: %s", self._image_path, err)
+            return None
+
+    @callback
+    def async_schedule_save(
+        self,
+        data_func: Callable[[], dict],
+        image_func: Callable[[], bytes | None],
+    ) -> None:
+        """Save the result returned by ``data_func`` after ``SAVE_DELAY`` seconds."""
+        self._data_func = data_func
+        self._image_func = image_func
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Write a pending save now, e.g. before the entry is reloaded.
+
+        Also waits for the image write, so the next setup reads the new file.
+        """
+        if self._save_pending:
+            await self._store.async_save(self._data_to_save())
+        if self._image_write is not None:
+            await self._image_write
+            self._image_write = None
+
+    @callback
+    def _data_to_save(self) -> dict:
+        self._save_pending = False
+        image = self._image_func()
+        if image is not None and image is not self._saved_image:
+            self._saved_image = image
+            self._image_write = self.hass.async_add_executor_job(
+                _write_bytes_atomic, self._image_path, image
+            )
+        return self._data_func()
+
+    async def async_remove(self) -> None:
+        """Delete the saved result when the entry is removed."""
+        await self._store.async_remove()
+        await self.hass.async_add_executor_job(self._image_path.unlink, True)
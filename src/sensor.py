@@ -1,22 +1,211 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
 from homeassistant.components.sensor import (
     SensorEntity,
+    SensorEntityDescription,
     SensorDeviceClass,
     SensorStateClass,
 )
-from homeassistant.const import UnitOfTime
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTime,
+)
 from homeassistant.helpers.restore_state import RestoreEntity
-from .const import DOMAIN, ATTR_INFERENCE_MS, ATTR_AVG_CONFIDENCE, ATTR_LAST_DETECTION
+from .const import (
+    DOMAIN,
+    ATTR_INFERENCE_MS,
+    ATTR_AVG_CONFIDENCE,
+    ATTR_LAST_DETECTION,
+    ATTR_INFERENCES_RUN,
+    ATTR_INFERENCES_SKIPPED,
+    ATTR_DETECTION_INTERVAL,
+    ATTR_LOOP_BLOCKING_MS,
+    ATTR_FRAMES_DROPPED,
+)
 from .coordinator import ObicoEntity
+from .metrics import (
+    STAGE_DECODE,
+    STAGE_ENCODE,
+    STAGE_FETCH,
+    STAGE_PREPROCESS,
+    STAGE_REQUEST,
+    STAGE_TOTAL,
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class ObicoSensorEntityDescription(SensorEntityDescription):
+    """Describes a diagnostic sensor read from the coordinator."""
+
+    value_fn: Callable[[Any], Any]
+    attrs_fn: Callable[[Any], dict | None] | None = None
+
+
+def _stage_sensor(stage: str, icon: str) -> ObicoSensorEntityDescription:
+    """Describe a sensor for one pipeline stage's duration.
+
+    The state is the latest duration; p50/p95/p99 over the rolling window
+    are exposed as attributes.
+    """
+    return ObicoSensorEntityDescription(
+        key=f"stage_{stage}_ms",
+        translation_key=f"stage_{stage}_ms",
+        icon=icon,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.stage_stats.last.get(stage),
+        attrs_fn=lambda coordinator: coordinator.stage_stats.summary(stage),
+    )
+
+
+STAT_SENSORS: tuple[ObicoSensorEntityDescription, ...] = (
+    ObicoSensorEntityDescription(
+        key=ATTR_INFERENCES_RUN,
+        translation_key=ATTR_INFERENCES_RUN,
+        icon="mdi:counter",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator: coordinator.data.get(ATTR_INFERENCES_RUN),
+    ),
+    ObicoSensorEntityDescription(
+        key=ATTR_INFERENCES_SKIPPED,
+        translation_key=ATTR_INFERENCES_SKIPPED,
+        icon="mdi:debug-step-over",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator: coordinator.data.get(ATTR_INFERENCES_SKIPPED),
+    ),
+    ObicoSensorEntityDescription(
+        key=ATTR_DETECTION_INTERVAL,
+        translation_key=ATTR_DETECTION_INTERVAL,
+        icon="mdi:timer-sync-outline",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator: coordinator.data.get(ATTR_DETECTION_INTERVAL),
+    ),
+    ObicoSensorEntityDescription(
+        key=ATTR_LOOP_BLOCKING_MS,
+        translation_key=ATTR_LOOP_BLOCKING_MS,
+        icon="mdi:timer-alert-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator: coordinator.data.get(ATTR_LOOP_BLOCKING_MS),
+    ),
+    ObicoSensorEntityDescription(
+        key=ATTR_FRAMES_DROPPED,
+        translation_key=ATTR_FRAMES_DROPPED,
+        icon="mdi:image-remove",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator: coordinator.data.get(ATTR_FRAMES_DROPPED),
+    ),
+    ObicoSensorEntityDescription(
+        key="rolling_failure_rate",
+        translation_key="rolling_failure_rate",
+        icon="mdi:alert-circle-outline",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.history.failure_rate,
+        attrs_fn=lambda coordinator: {"window": coordinator.history.count},
+    ),
+    ObicoSensorEntityDescription(
+        key="rolling_mean_confidence",
+        translation_key="rolling_mean_confidence",
+        icon="mdi:chart-bell-curve",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.history.mean_confidence,
+        attrs_fn=lambda coordinator: {"window": coordinator.history.count},
+    ),
+    ObicoSensorEntityDescription(
+        key="rolling_max_confidence",
+        translation_key="rolling_max_confidence",
+        icon="mdi:chart-line-variant",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.history.max_confidence,
+        attrs_fn=lambda coordinator: {"window": coordinator.history.count},
+    ),
+    ObicoSensorEntityDescription(
+        key="rolling_inference_p95",
+        translation_key="rolling_inference_p95",
+        icon="mdi:speedometer",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator: coordinator.history.inference_percentile(95),
+        attrs_fn=lambda coordinator: {
+            "p50": coordinator.history.inference_percentile(50),
+            "p99": coordinator.history.inference_percentile(99),
+            "window": coordinator.history.count,
+        },
+    ),
+    ObicoSensorEntityDescription(
+        key="image_memory",
+        translation_key="image_memory",
+        icon="mdi:memory",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        suggested_unit_of_measurement=UnitOfInformation.MEBIBYTES,
+        suggested_display_precision=1,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator: coordinator.image_store.usage,
+        attrs_fn=lambda coordinator: {
+            "peak": coordinator.image_store.peak,
+            "budget": coordinator.image_store.budget,
+            "entry_usage": coordinator.image_store.usage_of(
+                coordinator.config_entry.entry_id
+            ),
+            **coordinator.image_store.counts(),
+        },
+    ),
+    ObicoSensorEntityDescription(
+        key="frame_cache_hit_rate",
+        translation_key="frame_cache_hit_rate",
+        icon="mdi:camera-burst",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator: coordinator.frame_cache.hit_rate,
+        attrs_fn=lambda coordinator: {
+            "hits": coordinator.frame_cache.hits,
+            "misses": coordinator.frame_cache.misses,
+            "encode_hits": coordinator.frame_cache.encode_hits,
+            "encode_misses": coordinator.frame_cache.encode_misses,
+        },
+    ),
+    _stage_sensor(STAGE_FETCH, "mdi:camera-timer"),
+    _stage_sensor(STAGE_PREPROCESS, "mdi:crop"),
+    _stage_sensor(STAGE_ENCODE, "mdi:code-json"),
+    _stage_sensor(STAGE_REQUEST, "mdi:upload-network-outline"),
+    _stage_sensor(STAGE_DECODE, "mdi:code-braces"),
+    _stage_sensor(STAGE_TOTAL, "mdi:timer-outline"),
+)
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities(
-        [
-            ObicoConfidenceSensor(coordinator, entry),
-            ObicoInferenceTimeSensor(coordinator, entry),
-        ]
+    entities = [
+        ObicoConfidenceSensor(coordinator, entry),
+        ObicoInferenceTimeSensor(coordinator, entry),
+    ]
+    entities.extend(
+        ObicoStatSensor(coordinator, entry, description) for description in STAT_SENSORS
     )
+    async_add_entities(entities)
 
 
 class ObicoConfidenceSensor(ObicoEntity, SensorEntity, RestoreEntity):
@@ -43,7 +232,8 @@ class ObicoConfidenceSensor(ObicoEntity, SensorEntity, RestoreEntity):
     async def async_added_to_hass(self):
         await super().async_added_to_hass()
         state = await self.async_get_last_state()
-        if state and self.coordinator.data.get(ATTR_AVG_CONFIDENCE) == 0:
+        # A saved result wins, and may legitimately be 0 after re-filtering
+        if state and not self.coordinator.restored_from_store:
             try:
                 self.coordinator.data[ATTR_AVG_CONFIDENCE] = float(state.state)
             except (ValueError, TypeError):
@@ -76,8 +266,30 @@ class ObicoInferenceTimeSensor(ObicoEntity, SensorEntity, RestoreEntity):
     async def async_added_to_hass(self):
         await super().async_added_to_hass()
         state = await self.async_get_last_state()
-        if state and self.coordinator.data.get(ATTR_INFERENCE_MS) == 0:
+        if state and not self.coordinator.restored_from_store:
             try:
                 self.coordinator.data[ATTR_INFERENCE_MS] = float(state.state)
             except (ValueError, TypeError):
                 pass
+
+
+class ObicoStatSensor(ObicoEntity, SensorEntity):
+    """Diagnostic sensor driven by an ObicoSensorEntityDescription."""
+
+    _attr_has_entity_name = True
+    entity_description: ObicoSensorEntityDescription
+
+    def __init__(self, coordinator, entry, description):
+        super().__init__(coordinator, entry)
+        self.entity_description = description
+        self._attr_unique_id = f"{DOMAIN}_{entry.entry_id}_{description.key}"
+
+    @property
+    def native_value(self):
+        return self.entity_description.value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self):
+        if self.entity_description.attrs_fn is None:
+            return None
+        return self.entity_description.attrs_fn(self.coordinator)
@@ -0,0 +1,60 @@
+"""Shared fixtures: the integration imported from ``src/`` and the stub server."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "bench"))
+
+from stub_server import async_start  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def integration(tmp_path_factory):
+    """Make ``src/`` importable as ``custom_components.obico_ml``."""
+    config_dir = tmp_path_factory.mktemp("config")
+    package_dir = config_dir / "custom_components"
+    package_dir.mkdir()
+    (package_dir / "__init__.py").touch()
+    (package_dir / "obico_ml").symlink_to(REPO_ROOT / "src", target_is_directory=True)
+    sys.path.insert(0, str(config_dir))
+
+    import custom_components.obico_ml as integration
+
+    return integration
+
+
+@pytest.fixture
+def run_hass(integration, tmp_path):
+    """Run ``body(hass, start_stub)`` on a fresh loop and Home Assistant.
+
+    ``start_stub(server)`` serves a ``StubObicoServer`` on a free port and
+    returns its ``/detect`` URL; stubs and Home Assistant are torn down when
+    ``body`` returns.
+    """
+    from homeassistant.core import HomeAssistant
+
+    def run(body):
+        async def main():
+            hass = HomeAssistant(str(tmp_path))
+            hass.config.skip_pip = True
+            runners = []
+
+            async def start_stub(server) -> str:
+                runner, url = await async_start(server)
+                runners.append(runner)
+                return url
+
+            try:
+                return await body(hass, start_stub)
+            finally:
+                await hass.async_stop(force=True)
+                for runner in runners:
+                    await runner.cleanup()
+
+        return asyncio.run(main())
+
+    return run
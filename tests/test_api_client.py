@@ -0,0 +1,33 @@
+"""ObicoApiClient against the stub server."""
+
+import asyncio
+
+from stub_server import StubObicoServer
+
+
+def test_requests_queued_for_a_pooled_connection_do_not_time_out(integration, run_hass):
+    api = integration.api
+    connections = integration.const.DEFAULT_MAX_CONNECTIONS_PER_SERVER
+    # Every request takes longer than the connect timeout, so requests
+    # waiting for a free connection wait longer than it too
+    stub = StubObicoServer(latency_ms=300)
+
+    async def body(hass, start_stub):
+        client = api.ObicoApiClient(
+            hass, await start_stub(stub), transport="json", connect_timeout=0.2
+        )
+        try:
+            return client, await asyncio.gather(
+                *(client.async_detect(b"frame", 0.5) for _ in range(connections * 3)),
+                return_exceptions=True,
+            )
+        finally:
+            await client.async_close()
+
+    client, results = run_hass(body)
+
+    assert [type(result) for result in results] == [api.DetectionResult] * (
+        connections * 3
+    )
+    assert stub.stats["detect"] == connections * 3
+    assert client.breaker.failures == 0
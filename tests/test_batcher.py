@@ -0,0 +1,115 @@
+"""ObicoBatcher against the stub server's /detect/batch endpoint."""
+
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+from stub_server import StubObicoServer
+
+WINDOW = 0.05
+
+
+class ShortBatchStub(StubObicoServer):
+    """Answers a batch with one result too few."""
+
+    async def handle_batch(self, request: web.Request) -> web.Response:
+        response = await super().handle_batch(request)
+        results = json.loads(response.text)["results"]
+        return web.json_response({"results": results[:-1]})
+
+
+class GetOnlyBatchStub(StubObicoServer):
+    """Exposes /detect/batch for GET only, so a POST gets a 405."""
+
+    def __init__(self, **kwargs):
+        super().__init__(batch=False, **kwargs)
+
+    def make_app(self) -> web.Application:
+        app = super().make_app()
+        app.router.add_get("/detect/batch", self.handle_hc)
+        return app
+
+
+async def _async_detect_all(integration, hass, url, frames):
+    """Queue ``(image, threshold)`` frames together from separate clients."""
+    api = integration.api
+    clients = [api.ObicoApiClient(hass, url, transport="json") for _ in frames]
+    batcher = api.async_get_batcher(hass, url)
+    try:
+        return await asyncio.gather(
+            *(
+                batcher.async_detect(client, image, threshold, WINDOW)
+                for client, (image, threshold) in zip(clients, frames)
+            ),
+            return_exceptions=True,
+        )
+    finally:
+        for client in clients:
+            await client.async_close()
+
+
+def test_batch_results_are_split_back_to_each_caller(integration, run_hass):
+    stub = StubObicoServer(latency_ms=5, detections=1, confidence=0.6)
+    frames = [(b"frame-a", 0.5), (b"frame-b", 0.7), (b"frame-c", 0.1)]
+
+    async def body(hass, start_stub):
+        url = await start_stub(stub)
+        return await _async_detect_all(integration, hass, url, frames)
+
+    results = run_hass(body)
+
+    assert stub.stats["batch"] == 1
+    assert stub.stats["detect"] == 0
+    assert stub.stats["frames"] == 3
+    for (image, threshold), result in zip(frames, results):
+        # The stub echoes each frame as its annotated image
+        assert result.annotated_image == image
+        assert len(result.detections) == (1 if threshold <= 0.6 else 0)
+    assert len({result.upload_bytes for result in results}) == 1
+
+
+@pytest.mark.parametrize(
+    "stub",
+    [StubObicoServer(latency_ms=5, batch=False), GetOnlyBatchStub(latency_ms=5)],
+    ids=["404", "405"],
+)
+def test_missing_batch_endpoint_falls_back_to_single_requests(
+    integration, run_hass, stub
+):
+    frames = [(b"frame-a", 0.5), (b"frame-b", 0.5)]
+
+    async def body(hass, start_stub):
+        url = await start_stub(stub)
+        first = await _async_detect_all(integration, hass, url, frames)
+        batcher = integration.api.async_get_batcher(hass, url)
+        second = await _async_detect_all(integration, hass, url, frames)
+        return first, second, batcher
+
+    first, second, batcher = run_hass(body)
+
+    assert not batcher._batch_supported
+    for results in (first, second):
+        assert [result.annotated_image for result in results] == [
+            b"frame-a",
+            b"frame-b",
+        ]
+    # The failed batch attempt is not retried once it is known to be missing
+    assert stub.stats["batch"] == 0
+    assert stub.stats["detect"] == 4
+
+
+def test_wrong_result_count_fails_every_caller(integration, run_hass):
+    stub = ShortBatchStub(latency_ms=5)
+    frames = [(b"frame-a", 0.5), (b"frame-b", 0.5)]
+
+    async def body(hass, start_stub):
+        url = await start_stub(stub)
+        return await _async_detect_all(integration, hass, url, frames)
+
+    results = run_hass(body)
+
+    assert stub.stats["batch"] == 1
+    for result in results:
+        assert isinstance(result, integration.api.ObicoApiError)
+        assert "1 results for 2 frames" in str(result)
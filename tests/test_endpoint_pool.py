@@ -0,0 +1,91 @@
+"""ObicoEndpointPool failover and hedging across two stub endpoints."""
+
+import socket
+import time
+
+import pytest
+from stub_server import StubObicoServer
+
+
+def _closed_port_url() -> str:
+    """A /detect URL nothing listens on, so connecting is refused."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/detect"
+
+
+def test_primary_down_fails_over_to_the_next_endpoint(integration, run_hass):
+    secondary = StubObicoServer(latency_ms=5)
+
+    async def body(hass, start_stub):
+        pool = integration.api.ObicoEndpointPool(
+            hass, [_closed_port_url(), await start_stub(secondary)], transport="json"
+        )
+        try:
+            result = await pool.async_detect(b"frame", 0.5)
+        finally:
+            await pool.async_close()
+        return pool, result
+
+    pool, result = run_hass(body)
+
+    assert result.annotated_image == b"frame"
+    assert secondary.stats["detect"] == 1
+    assert pool.primary.breaker.failures == 1
+    assert pool.active_transport == pool.clients[1].active_transport
+
+
+def test_slow_primary_is_hedged_and_the_faster_endpoint_wins(integration, run_hass):
+    primary = StubObicoServer(latency_ms=500)
+    secondary = StubObicoServer(latency_ms=5)
+
+    async def body(hass, start_stub):
+        pool = integration.api.ObicoEndpointPool(
+            hass,
+            [await start_stub(primary), await start_stub(secondary)],
+            transport="json",
+            hedge_after_ms=50,
+        )
+        try:
+            start = time.perf_counter()
+            result = await pool.async_detect(b"frame", 0.5)
+            elapsed = time.perf_counter() - start
+        finally:
+            await pool.async_close()
+        return pool, result, elapsed
+
+    pool, result, elapsed = run_hass(body)
+
+    assert result.annotated_image == b"frame"
+    assert primary.stats["detect"] == 1
+    assert secondary.stats["detect"] == 1
+    assert elapsed < 0.4
+    assert pool._last_client is pool.clients[1]
+    # The losing request was cancelled, not counted as a failure
+    assert pool.primary.breaker.failures == 0
+
+
+def test_all_endpoints_open_raises_unavailable(integration, run_hass):
+    api = integration.api
+    stubs = [StubObicoServer(latency_ms=5), StubObicoServer(latency_ms=5)]
+
+    async def body(hass, start_stub):
+        pool = api.ObicoEndpointPool(
+            hass, [await start_stub(stub) for stub in stubs], transport="json"
+        )
+        for client in pool.clients:
+            for _ in range(api.BREAKER_FAILURE_THRESHOLD):
+                client.breaker.record_failure()
+        try:
+            with pytest.raises(api.ObicoUnavailableError) as err:
+                await pool.async_detect(b"frame", 0.5)
+        finally:
+            await pool.async_close()
+        return pool, err.value
+
+    pool, err = run_hass(body)
+
+    assert pool.state == integration.api.BREAKER_OPEN
+    assert err.retry_in == pytest.approx(pool.retry_in, abs=1)
+    assert [stub.stats["detect"] for stub in stubs] == [0, 0]
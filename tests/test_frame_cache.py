@@ -0,0 +1,40 @@
+"""Lifetime of the base64 encodings shared through ObicoFrameCache."""
+
+import asyncio
+import base64
+
+
+def test_encoding_is_shared_then_released_after_the_ttl(integration, run_hass):
+    async def body(hass, start_stub):
+        cache = integration.frame_cache.ObicoFrameCache(hass, ttl=0.05)
+        image = b"frame" * 100
+        first, second = await asyncio.gather(
+            cache.async_encode(image), cache.async_encode(image)
+        )
+        # Equal bytes are a different frame; only the same object is shared
+        await cache.async_encode(bytes(bytearray(image)))
+        held = cache.as_dict()["encoded_frames"]
+        await asyncio.sleep(0.1)
+        return cache, first, second, held
+
+    cache, first, second, held = run_hass(body)
+
+    assert first == second == base64.b64encode(b"frame" * 100).decode()
+    assert (cache.encode_hits, cache.encode_misses) == (1, 2)
+    assert held == 2
+    assert cache.as_dict()["encoded_frames"] == 0
+
+
+def test_without_ttl_only_overlapping_encodes_are_shared(integration, run_hass):
+    async def body(hass, start_stub):
+        cache = integration.frame_cache.ObicoFrameCache(hass)
+        image = b"frame" * 100
+        await asyncio.gather(cache.async_encode(image), cache.async_encode(image))
+        held = cache.as_dict()["encoded_frames"]
+        await cache.async_encode(image)
+        return cache, held
+
+    cache, held = run_hass(body)
+
+    assert held == 0
+    assert (cache.encode_hits, cache.encode_misses) == (1, 2)
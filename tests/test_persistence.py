@@ -0,0 +1,67 @@
+"""Saving and restoring an entry's last result across restarts."""
+
+from homeassistant.config_entries import ConfigEntry
+
+ENTRY_ID = "persisted"
+
+
+def _make_coordinator(integration, hass):
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=integration.const.DOMAIN,
+        title="persisted",
+        data={},
+        source="user",
+        options={},
+        entry_id=ENTRY_ID,
+    )
+    return integration.coordinator.ObicoDataUpdateCoordinator(
+        hass,
+        config_entry=entry,
+        url="http://127.0.0.1:1/detect",
+        camera_entity="camera.printer",
+        interval=60,
+        threshold=0.2,
+    )
+
+
+async def _async_save(coordinator) -> None:
+    coordinator._result_store.async_schedule_save(
+        coordinator._result_to_save, coordinator._image_to_save
+    )
+    await coordinator._result_store.async_flush()
+
+
+def test_unviewed_restored_image_survives_another_save(integration, run_hass):
+    async def body(hass, start_stub):
+        first = _make_coordinator(integration, hass)
+        await first.image_store.async_put(first._image_key, b"jpeg", size=(4, 3))
+        await _async_save(first)
+
+        # Restarted: restored, but the camera is not viewed before the next save
+        second = _make_coordinator(integration, hass)
+        await second.async_restore()
+        await _async_save(second)
+
+        third = _make_coordinator(integration, hass)
+        await third.async_restore()
+        return await third.async_get_image(), third.image_store.peek(third._image_key)
+
+    content, stored = run_hass(body)
+
+    assert content == b"jpeg"
+    assert stored.size == (4, 3)
+
+
+def test_restore_reports_whether_a_saved_result_was_found(integration, run_hass):
+    async def body(hass, start_stub):
+        fresh = _make_coordinator(integration, hass)
+        await fresh.async_restore()
+        await _async_save(fresh)
+
+        restarted = _make_coordinator(integration, hass)
+        await restarted.async_restore()
+        return fresh.restored_from_store, restarted.restored_from_store
+
+    assert run_hass(body) == (False, True)